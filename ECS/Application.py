@@ -1,15 +1,7 @@
 from ECS.SceneManager import SceneManager
 from ECS.Renderer.Renderer2D import Renderer2D
-
-import glfw
-
-from enum import Enum
-
-class RenderAPI(Enum):
-    NONE = 0
-    OPENGL = 1
-    WEBGPU = 2
-    RAYTRACING = 3
+from ECS.Renderer.RenderCommand import RendererAPI
+from ECS.Profiler import Profiler
 
 class Application(object):
     def __new__(cls):
@@ -21,45 +13,95 @@ class Application(object):
             cls.instance.last_time = 0.0
             cls.instance.timer = 0.0
             cls.instance.frames = 0.0
+            cls.instance.fixed_time_step = 1.0 / 60.0
+            cls.instance.max_fixed_steps = 5
+            cls.instance.accumulator = 0.0
+            cls.instance.interpolation_alpha = 0.0
         return cls.instance
     
     def get_window(cls):
         return cls.instance.window
     
+    def is_headless(cls):
+        return cls.instance.window is not None and cls.instance.window.is_headless()
+
     def is_running(cls):
         return cls.instance.is_application_running
     
     def set_is_running(cls, is_running):
         cls.instance.is_application_running = is_running
 
-    def create(cls, window):
+    def set_fixed_tick_rate(cls, tick_rate: float, max_fixed_steps: int = 5):
+        """
+        Sets how many fixed simulation ticks run per second and how many of them a single frame may run to catch up.
+        """
+        cls.instance.fixed_time_step = 1.0 / tick_rate
+        cls.instance.max_fixed_steps = max_fixed_steps
+
+    def get_fixed_time_step(cls):
+        return cls.instance.fixed_time_step
+
+    def get_interpolation_alpha(cls):
+        """
+        How far the current frame is between the last two fixed ticks, in [0, 1), for interpolating rendered state.
+        """
+        return cls.instance.interpolation_alpha
+
+    def create(cls, window, renderer_api: RendererAPI = RendererAPI.OPENGL):
         cls.instance.window = window
         cls.instance.window.create()
-        Renderer2D().initialize()
+
+        if not cls.instance.is_headless():
+            Renderer2D().initialize(renderer_api)
 
     def start(cls):
         SceneManager().on_create()
 
         def main_loop():
-            cls.instance.begin_frame()
-            Renderer2D().begin_frame()
-            SceneManager().on_update(cls.instance.delta_time)
-            Renderer2D().end_frame()
-            cls.instance.end_frame()
+            with Profiler().scope('Application.frame', 'frame'):
+                cls.instance.begin_frame()
+                Renderer2D().begin_frame()
+                cls.instance.fixed_update()
+                SceneManager().on_update(cls.instance.delta_time)
+                Renderer2D().end_frame()
+                cls.instance.end_frame()
+
+        def headless_main_loop():
+            with Profiler().scope('Application.frame', 'frame'):
+                cls.instance.begin_frame()
+                cls.instance.fixed_update()
+                SceneManager().on_update(cls.instance.delta_time)
+                cls.instance.end_frame()
 
-        cls.instance.window.dispatch_main_loop(main_loop)
+        cls.instance.window.dispatch_main_loop(headless_main_loop if cls.instance.is_headless() else main_loop)
 
         cls.instance.clean()
 
     def begin_frame(cls):
-        time = glfw.get_time()
+        time = cls.instance.window.get_time()
         cls.instance.delta_time = time - cls.instance.last_time
         cls.instance.last_time = time
 
+    def fixed_update(cls):
+        cls.instance.accumulator += cls.instance.delta_time
+
+        # Run as many fixed ticks as the elapsed time asks for, up to the catch up budget
+        steps = 0
+        while cls.instance.accumulator >= cls.instance.fixed_time_step and steps < cls.instance.max_fixed_steps:
+            SceneManager().on_fixed_update(cls.instance.fixed_time_step)
+            cls.instance.accumulator -= cls.instance.fixed_time_step
+            steps += 1
+
+        # Drop the time that did not fit in the budget instead of spiraling further behind
+        if cls.instance.accumulator >= cls.instance.fixed_time_step:
+            cls.instance.accumulator %= cls.instance.fixed_time_step
+
+        cls.instance.interpolation_alpha = cls.instance.accumulator / cls.instance.fixed_time_step
+
     def end_frame(cls):
         # Calculate fps
         cls.instance.frames += 1
-        if glfw.get_time() - cls.instance.timer > 1.0:
+        if cls.instance.window.get_time() - cls.instance.timer > 1.0:
             cls.instance.window.set_title(f'[FPS: {cls.instance.frames}]')
             cls.instance.timer += 1
             cls.instance.frames = 0
@@ -72,4 +114,5 @@ class Application(object):
         if (cls.instance.window is not None):
             cls.instance.window.destroy()
 
-        Renderer2D().clean()
\ No newline at end of file
+        if not cls.instance.is_headless():
+            Renderer2D().clean()
\ No newline at end of file
@@ -0,0 +1,58 @@
+class Archetype:
+    """
+    A table holding every entity that has exactly the same set of component types.
+    Each component type gets its own column and an entity occupies the same row in all of them.
+    """
+
+    def __init__(self, component_types: frozenset):
+        self.component_types = component_types
+        self.entities = []
+        self.columns = {component_type: [] for component_type in component_types}
+
+        # Cached neighbouring archetypes, keyed by the component type that is added or removed
+        self.add_edges = {}
+        self.remove_edges = {}
+
+    def __len__(self):
+        return len(self.entities)
+
+    def matches(self, component_types):
+        return all(component_type in self.component_types for component_type in component_types)
+
+    def get_column(self, component_type: type):
+        return self.columns[component_type]
+
+    def get(self, row: int, component_type: type):
+        return self.columns[component_type][row]
+
+    def set(self, row: int, component):
+        self.columns[type(component)][row] = component
+
+    def append(self, entity, components: dict):
+        row = len(self.entities)
+
+        self.entities.append(entity)
+        for component_type, column in self.columns.items():
+            column.append(components[component_type])
+
+        return row
+
+    def swap_remove(self, row: int):
+        """
+        Removes the given row by moving the last row into its place.
+        Returns the components of the removed row and the entity that got moved (or None if the last row was removed).
+        """
+        components = {}
+        last = len(self.entities) - 1
+
+        for component_type, column in self.columns.items():
+            components[component_type] = column[row]
+            column[row] = column[last]
+            column.pop()
+
+        self.entities[row] = self.entities[last]
+        self.entities.pop()
+
+        moved_entity = self.entities[row] if row != last else None
+
+        return components, moved_entity
@@ -1,4 +1,5 @@
 from ECS.Entity import Entity
+from ECS.ComponentPool import PooledComponent
 import numpy as np
 
 class InfoComponent:
@@ -6,7 +7,31 @@ class InfoComponent:
         self.tag = name
         self.enabled = True
 
-class TransformComponent:
+class TransformComponent(PooledComponent):
+    __slots__ = ()
+
+    schema = [
+        ('translation', np.float32, (3,)),
+        ('rotation', np.float32, (3,)),
+        ('scale', np.float32, (3,)),
+        ('local_matrix', np.float32, (4, 4)),
+        ('world_matrix', np.float32, (4, 4)),
+        ('is_dirty', np.bool_),
+        ('is_static', np.bool_),
+        ('is_modified', np.bool_),
+        ('previous_translation', np.float32, (3,)),
+        ('previous_rotation', np.float32, (3,)),
+        ('previous_scale', np.float32, (3,)),
+    ]
+
+    # Assigning translation, rotation or scale marks the transform modified, in place edits are caught by the TransformSystem.
+    # is_dirty is raised by the systems for the transforms whose matrices they recomputed in the current frame
+    tracked_fields = ('translation', 'rotation', 'scale')
+    dirty_field = 'is_modified'
+
+    # Written by the TransformSystem for its change tracking, they do not stamp the transform as changed
+    bookkeeping_fields = ('is_dirty', 'is_modified', 'previous_translation', 'previous_rotation', 'previous_scale')
+
     def __init__(self, translation, rotation, scale):
         self.translation = translation
         self.rotation = rotation
@@ -20,16 +45,29 @@ class TransformComponent:
 
 class LinkComponent:
     def __init__(self, parent: Entity):
+        # The scene whose hierarchy the link is part of, set by the scene's LinkSystem
+        self.scene = None
         self.parent: Entity = parent
 
+    @property
+    def parent(self):
+        return self._parent
+
+    @parent.setter
+    def parent(self, parent: Entity):
+        self._parent = parent
+
+        # Tells the scene's LinkSystem to rebuild its hierarchy, links it has not seen yet come with a new query version anyway
+        if self.scene is not None:
+            self.scene.hierarchy_version += 1
+
 class RenderComponent:
     def __init__(self, attributes, indices):
         self.attributes = attributes
         self.indices = indices
-        self.vao = 0
-        self.vbo = []
-        self.ebo = 0
-        self.batch = -1
+
+        # The Renderer2D batch the entity is drawn with, assigned by the RenderingSystem
+        self.batch = None
 
 class MaterialComponent:
     def __init__(self, name):
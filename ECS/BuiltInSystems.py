@@ -1,31 +1,77 @@
-from ECS.SceneManager import SceneManager
 from ECS.System import System
 from ECS.Entity import Entity
 from ECS.Renderer.Renderer2D import Renderer2D
+from ECS.Renderer.RenderCommand import RenderCommand
 from ECS.Utilities.MaterialLib import MaterialLib
 
-from ECS.BuiltInComponents import TransformComponent, LinkComponent
+from ECS.BuiltInComponents import TransformComponent, LinkComponent, RenderComponent, MaterialComponent
 
 from ECS.Math import *
 
-import OpenGL.GL as gl
-
 class TransformSystem(System):
     """
     The system responsible for transformations.
+    By default the matrices of all filtered entities are computed with a few NumPy calls per frame,
+    constructed with batched=False on_create and on_update are called per entity instead.
+    After on_create only transforms that changed get recomputed and flagged dirty: the ones flagged modified by an assignment
+    and the ones whose translation, rotation or scale differ from the values of the last computation.
+    Static transforms are not compared, they are recomputed only when flagged modified.
     """
 
+    reads = [TransformComponent]
+    writes = [TransformComponent]
+
+    def on_create_batch(self, entities, transforms):
+        """
+        Gets called once in the first frame with the transforms of all entities that the system operates on.
+        """
+        transforms.local_matrix = compose_transform_batch(transforms.translation, transforms.rotation, transforms.scale)
+        transforms.world_matrix = transforms.local_matrix
+        transforms.is_dirty = np.ones(len(entities), dtype=np.bool_)
+        transforms.is_modified = np.zeros(len(entities), dtype=np.bool_)
+
+        transforms.previous_translation = transforms.translation
+        transforms.previous_rotation = transforms.rotation
+        transforms.previous_scale = transforms.scale
+
+    def on_update_batch(self, ts, entities, transforms):
+        """
+        Gets called every frame with the transforms of all entities that the system operates on.
+        Changed transforms are found with a vectorized comparison and their local matrices computed as one (N, 4, 4) array.
+        """
+        translations, rotations, scales = transforms.translation, transforms.rotation, transforms.scale
+
+        is_changed = (np.any(translations != transforms.previous_translation, axis=1)
+                      | np.any(rotations != transforms.previous_rotation, axis=1)
+                      | np.any(scales != transforms.previous_scale, axis=1))
+        is_dirty = transforms.is_modified | (is_changed & ~transforms.is_static)
+
+        # Clears the flags raised last frame as well
+        transforms.is_dirty = is_dirty
+        transforms.is_modified = np.zeros(len(entities), dtype=np.bool_)
+
+        changed = np.flatnonzero(is_dirty)
+        if len(changed) == 0:
+            return
+
+        local_matrices = compose_transform_batch(translations[changed], rotations[changed], scales[changed])
+
+        # World matrices of unchanged entities are left as they are, the LinkSystem keeps the linked ones up to date
+        transforms.local_matrix[changed] = local_matrices
+        transforms.world_matrix[changed] = local_matrices
+        transforms.mark_changed(changed)
+
+        transforms.previous_translation[changed] = translations[changed]
+        transforms.previous_rotation[changed] = rotations[changed]
+        transforms.previous_scale[changed] = scales[changed]
+
     def on_create(self, entity: Entity, components):
         """
         Gets called once in the first frame for every entity that the system operates on.
         """
         transform = components
 
-        T = translate(transform.translation[0], transform.translation[1], transform.translation[2])
-        R = rotate((1, 0, 0), transform.rotation[0]) @ rotate((0, 1, 0), transform.rotation[1]) @ rotate((0, 0, 1), transform.rotation[2])
-        S = scale(transform.scale[0], transform.scale[1], transform.scale[2])
-        
-        transform.local_matrix = S @ R @ T
+        self.compute_local_matrix(transform)
 
     def on_update(self, ts, entity: Entity, components):
         """
@@ -33,80 +79,252 @@ class TransformSystem(System):
         """
         transform = components
 
-        previous_local_matrix = transform.local_matrix
-        
+        if not transform.is_modified:
+            transform.is_dirty = False
+
+            if transform.is_static:
+                return
+
+            if (np.array_equal(transform.translation, transform.previous_translation)
+                and np.array_equal(transform.rotation, transform.previous_rotation)
+                and np.array_equal(transform.scale, transform.previous_scale)):
+                return
+
+        self.compute_local_matrix(transform)
+
+    def compute_local_matrix(self, transform):
         T = translate(transform.translation[0], transform.translation[1], transform.translation[2])
         R = rotate((1, 0, 0), transform.rotation[0]) @ rotate((0, 1, 0), transform.rotation[1]) @ rotate((0, 0, 1), transform.rotation[2])
         S = scale(transform.scale[0], transform.scale[1], transform.scale[2])
-        
+
         transform.local_matrix = S @ R @ T
         transform.world_matrix = transform.local_matrix
+        transform.is_dirty = True
+        transform.is_modified = False
 
-        if (np.array_equal(previous_local_matrix, transform.local_matrix)):
-            transform.is_dirty = False
-        else:
-            transform.is_dirty = True
+        transform.previous_translation = transform.translation
+        transform.previous_rotation = transform.rotation
+        transform.previous_scale = transform.scale
 
 class LinkSystem(System):
     """
     The system responsible for the scene hierachy.
+    Linked transforms are grouped by their depth in the hierarchy, as arrays of child and parent slots in the transform pool,
+    rebuilt only when linked entities come or go or a parent changes. Slots moved by removals from the pool are resolved again without a rebuild.
+    Every level is then computed with one batched parent_world @ local product, from the root level down.
+    Transforms whose parent and own transform did not change are skipped, so after a rebuild only added and reparented subtrees get recomputed.
+    Constructed with batched=False the levels are walked one transform at a time instead, parents are still computed before their children.
+    Entities that leave the hierarchy, by losing their parent or their link, get their world matrix reset to their local one.
     """
 
-    def on_create(self, entity: Entity, components):
+    reads = [LinkComponent, TransformComponent]
+    writes = [TransformComponent]
+
+    def __init__(self, filters: list[type], batched = True, exclude: list[type] = None, reads: list[type] = None, writes: list[type] = None, change_filters: list = None):
+        # The batch hooks always run, per entity hooks would visit children before their parents
+        super().__init__(filters, True, exclude, reads, writes, change_filters)
+        self.per_entity = not batched
+
+        self.levels = []
+        self.hierarchy_key = None
+
+        # Child and parent transforms of every level, to resolve their slots again once the pool moved some
+        self.level_transforms = []
+        self.layout_version = None
+
+        # Own and parent transform of every linked entity at the last rebuild, by entity id
+        self.linked_transforms = {}
+
+    def on_create_batch(self, entities, links, transforms):
         """
-        Gets called once in the first frame for every entity that the system operates on.
+        Gets called once in the first frame, computes the world matrices of all linked entities.
         """
-        link, transform = components
-        transform.world_matrix = self.get_world_space_transform(entity, link)
+        self.update_hierarchy()
 
-    def on_update(self, ts, entity: Entity, components):
+        if self.per_entity:
+            self.propagate_per_entity(force = True)
+        else:
+            self.propagate(force = True)
+
+    def on_update_batch(self, ts, entities, links, transforms):
         """
-        Gets called every frame for every entity that the system operates on.
+        Gets called every frame, recomputes the world matrices of the linked entities below a changed transform.
         """
-        link, transform = components
-        transform.world_matrix = self.get_world_space_transform(entity, link)
+        self.update_hierarchy()
+
+        if self.per_entity:
+            self.propagate_per_entity()
+        else:
+            self.propagate()
 
-    def get_world_space_transform(self, entity, link):
-        transform = np.identity(4)
+    def update_hierarchy(self):
+        pool = self.scene.get_component_pool(TransformComponent)
 
-        if (link != None):
-            if (link.parent != None):
-                parent_link = SceneManager().get_active_scene().get_component(link.parent, LinkComponent)
-                transform = self.get_world_space_transform(link.parent, parent_link)
+        # Rebuild only when linked entities came or went or a parent changed, transforms of other entities do not matter
+        key = (self.query.version, self.scene.hierarchy_version)
+        if self.hierarchy_key == key and (self.layout_version == pool.layout_version or self.resolve_slots(pool)):
+            return
 
-        return transform @ SceneManager().get_active_scene().get_component(entity, TransformComponent).local_matrix
+        depths = {}
+        levels = {}
+        linked_transforms = {}
+        changed_slots = []
+
+        for entity, (link, transform) in self.query:
+            link.scene = self.scene
+
+            parent_transform = None
+            if link.parent is not None and self.scene.is_alive(link.parent):
+                parent_transform = self.scene.get_component(link.parent, TransformComponent)
+
+            # Roots keep the world matrix the TransformSystem gave them
+            if parent_transform is None:
+                continue
+
+            linked_transforms[entity.id] = (transform, parent_transform)
+            if self.linked_transforms.get(entity.id, (None, None))[1] is not parent_transform:
+                changed_slots.append(transform._slot)
+
+            child_transforms, level_parent_transforms = levels.setdefault(self.get_depth(entity, depths), ([], []))
+            child_transforms.append(transform)
+            level_parent_transforms.append(parent_transform)
+
+        # Entities no longer below a parent, their world matrices would otherwise keep the parent's transform
+        for entity_id, (transform, _) in self.linked_transforms.items():
+            if entity_id not in linked_transforms and transform._pool is pool:
+                transform.world_matrix = transform.local_matrix
+                changed_slots.append(transform._slot)
+
+        self.level_transforms = [transforms for _, transforms in sorted(levels.items())]
+        self.linked_transforms = linked_transforms
+        self.hierarchy_key = key
+        self.resolve_slots(pool)
+
+        # Added and reparented entities get recomputed along with everything below them
+        pool.columns['is_dirty'][np.array(changed_slots, dtype=np.intp)] = True
+
+    def resolve_slots(self, pool):
+        """
+        Looks up the current slots of the transforms of every level. Returns False if a parent transform left the pool, the hierarchy has to be rebuilt then.
+        """
+        levels = []
+
+        for child_transforms, parent_transforms in self.level_transforms:
+            parent_slots = np.fromiter(
+                (transform._slot if transform._pool is pool else -1 for transform in parent_transforms), dtype=np.intp, count=len(parent_transforms)
+            )
+            if len(parent_slots) != 0 and parent_slots.min() < 0:
+                return False
+
+            child_slots = np.fromiter((transform._slot for transform in child_transforms), dtype=np.intp, count=len(child_transforms))
+            levels.append((child_slots, parent_slots))
+
+        self.levels = levels
+        self.layout_version = pool.layout_version
+
+        return True
+
+    def get_depth(self, entity, depths: dict):
+        # Walk up until an entity of known depth or a root, then fill in the depths on the way back
+        chain = []
+        while entity.id not in depths:
+            chain.append(entity)
+
+            link = self.scene.get_component(entity, LinkComponent) if self.scene.is_alive(entity) else None
+            if link is None or link.parent is None or not self.scene.is_alive(link.parent):
+                depths[entity.id] = 0
+                chain.pop()
+                break
+
+            entity = link.parent
+
+        depth = depths[entity.id]
+        for entity in reversed(chain):
+            depth += 1
+            depths[entity.id] = depth
+
+        return depth
+
+    def propagate(self, force = False):
+        pool = self.scene.get_component_pool(TransformComponent)
+        world_matrices = pool.columns['world_matrix']
+        local_matrices = pool.columns['local_matrix']
+        is_dirty = pool.columns['is_dirty']
+
+        for child_slots, parent_slots in self.levels:
+            if not force:
+                changed = np.flatnonzero(is_dirty[parent_slots] | is_dirty[child_slots])
+                if len(changed) == 0:
+                    continue
+
+                child_slots, parent_slots = child_slots[changed], parent_slots[changed]
+
+            world_matrices[child_slots] = np.matmul(world_matrices[parent_slots], local_matrices[child_slots])
+            pool.mark_changed(child_slots)
+
+            # Children on the next levels see these transforms as changed
+            is_dirty[child_slots] = True
+
+    def propagate_per_entity(self, force = False):
+        for child_transforms, parent_transforms in self.level_transforms:
+            for child_transform, parent_transform in zip(child_transforms, parent_transforms):
+                if not force and not parent_transform.is_dirty and not child_transform.is_dirty:
+                    continue
+
+                child_transform.world_matrix = parent_transform.world_matrix @ child_transform.local_matrix
+
+                # Children on the next levels see this transform as changed
+                child_transform.is_dirty = True
 
 class RenderingSystem(System):
     """
     The system responsible for rendering.
     """
 
+    reads = [TransformComponent]
+    writes = [RenderComponent, MaterialComponent]
+    main_thread = True
+    requires_graphics = True
+
+    def __init__(self, filters: list[type], batched = True, exclude: list[type] = None, reads: list[type] = None, writes: list[type] = None, change_filters: list = None):
+        super().__init__(filters, batched, exclude, reads, writes, change_filters)
+
+        # Matrices for projection and view, the view also tells how far from the camera each entity is, which orders the draws
+        self.projection = perspective(45.0, 1920 / 1080, 0.1, 100.0)
+        self.view = translate(0.0, 0.0, -5.0)
+
     def on_create(self, entity: Entity, components):
         """
         Gets called once in the first frame for every entity that the system operates on.
         """
         render_data, material, transform = components
 
+        self.prepare(render_data, material)
+
+    def prepare(self, render_data, material):
+        """
+        Looks up the material and the batch of an entity, in on_create or the first time an entity added later gets drawn.
+        """
         material.instance = MaterialLib().get(material.name)
 
         render_data.batch = Renderer2D().add_batch(render_data, material)
 
-        # Set up matrices for projection and view
-        projection = perspective(45.0, 1920 / 1080, 0.1, 100.0)
-        view = translate(0.0, 0.0, -5.0)
-        model = identity()
-
-        gl.glUniformMatrix4fv(gl.glGetUniformLocation(material.instance.shader_program, "projection"), 1, gl.GL_FALSE, projection)
-        gl.glUniformMatrix4fv(gl.glGetUniformLocation(material.instance.shader_program, "view"), 1, gl.GL_FALSE, view)
-        gl.glUniformMatrix4fv(gl.glGetUniformLocation(material.instance.shader_program, "model"), 1, gl.GL_FALSE, model)
+        RenderCommand.set_uniform_matrix(material.instance.shader_program, "projection", self.projection)
+        RenderCommand.set_uniform_matrix(material.instance.shader_program, "view", self.view)
+        RenderCommand.set_uniform_matrix(material.instance.shader_program, "model", identity())
 
     def on_update(self, ts, entity: Entity, components):
         """
         Gets called every frame for every entity that the system operates on.
         """
         render_data, material, transform = components
-        
-        if (render_data.indices is None):
-            Renderer2D().draw(transform.world_matrix, render_data, material)
-        else:
-            Renderer2D().draw_indexed(transform.world_matrix, render_data, material)
+
+        # Entities added after the first frame
+        if render_data.batch is None:
+            self.prepare(render_data, material)
+
+        # Distance along the camera's forward axis, the camera looks down -z in view space
+        depth = -float(self.view[2] @ transform.world_matrix[:, 3])
+
+        # Submitted to the render queue, drawn sorted by state and depth when the frame ends
+        Renderer2D().draw(transform.world_matrix, render_data, render_data.batch, depth)
@@ -0,0 +1,70 @@
+from ECS.Entity import Entity
+
+from enum import Enum
+
+class CommandType(Enum):
+    SPAWN = 0
+    DESTROY = 1
+    ADD_COMPONENT = 2
+    REMOVE_COMPONENT = 3
+
+class CommandBuffer:
+    """
+    Records structural changes (spawns, destroys, component additions and removals) while systems are iterating,
+    so that the scene can apply them in one sweep at a sync point.
+    """
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.commands = []
+
+    def __len__(self):
+        return len(self.commands)
+
+    def spawn(self, *components):
+        """
+        Reserves an entity handle right away, the entity and its components are added on playback.
+        """
+        entity = self.scene.reserve_entity()
+        self.commands.append((CommandType.SPAWN, entity, list(components)))
+        return entity
+
+    def destroy(self, entity: Entity):
+        self.commands.append((CommandType.DESTROY, entity, None))
+
+    def add_component(self, entity: Entity, component):
+        self.commands.append((CommandType.ADD_COMPONENT, entity, component))
+        return component
+
+    def remove_component(self, entity: Entity, component_type: type):
+        self.commands.append((CommandType.REMOVE_COMPONENT, entity, component_type))
+
+    def playback(self):
+        commands = self.commands
+        self.commands = []
+
+        index = 0
+        while index < len(commands):
+            command_type, entity, data = commands[index]
+            index += 1
+
+            # Skip commands for entities that got destroyed earlier in the buffer
+            if command_type is not CommandType.SPAWN and not self.scene.is_alive(entity):
+                continue
+
+            if command_type is CommandType.SPAWN or command_type is CommandType.ADD_COMPONENT:
+                components = data if command_type is CommandType.SPAWN else [data]
+
+                # Gather the following additions to the same entity so it moves between archetypes only once
+                while index < len(commands) and commands[index][0] is CommandType.ADD_COMPONENT and commands[index][1] == entity:
+                    components.append(commands[index][2])
+                    index += 1
+
+                if command_type is CommandType.SPAWN:
+                    self.scene.enroll_entity(entity)
+
+                self.scene.add_components(entity, *components)
+            elif command_type is CommandType.DESTROY:
+                self.scene.destroy_entity(entity)
+            elif command_type is CommandType.REMOVE_COMPONENT:
+                self.scene.remove_component(entity, data)
@@ -0,0 +1,328 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+class ComponentPool:
+    """
+    Contiguous storage for every component of a type that declares a schema.
+    Each schema field lives in its own NumPy column (structure of arrays) and a component occupies the same slot in all of them.
+    Two more columns keep the change ticks of the scene at which each component was added and last changed.
+    """
+
+    def __init__(self, dtype: np.dtype, capacity = 64, bookkeeping_fields = ()):
+        self.dtype = dtype
+        self.columns = {}
+        self.components = []
+        self.count = 0
+        self.version = 0
+
+        # Bumped when a component leaves the pool, which moves the last one into its slot, appending keeps every slot in place
+        self.layout_version = 0
+
+        # Provides the current change tick once the pool belongs to a scene, writes to other fields than these stamp it
+        self.clock = None
+        self.bookkeeping_fields = frozenset(bookkeeping_fields) | {'added_tick', 'changed_tick'}
+
+        # Shared memory block per column, set once the pool is shared with worker processes
+        self.shared_blocks = None
+        self.pending_blocks = []
+
+        for name in dtype.names:
+            field = dtype.fields[name][0]
+            self.columns[name] = self.create_column(name, (capacity,) + field.shape, field.base)
+
+        for name in ('added_tick', 'changed_tick'):
+            self.columns[name] = self.create_column(name, (capacity,), np.dtype(np.uint64))
+
+    def __len__(self):
+        return self.count
+
+    def get_capacity(self):
+        return len(next(iter(self.columns.values())))
+
+    def column(self, name: str):
+        """
+        Returns a view over the used part of a column, valid until the pool grows.
+        """
+        return self.columns[name][:self.count]
+
+    def create_column(self, name: str, shape: tuple, dtype: np.dtype):
+        if self.shared_blocks is None:
+            return np.zeros(shape, dtype=dtype)
+
+        block = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+
+        # The previous block of the column is no longer needed once its data got copied
+        previous_block = self.shared_blocks.get(name)
+        self.shared_blocks[name] = block
+
+        column = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        column.fill(0)
+
+        if previous_block is not None:
+            self.pending_blocks.append(previous_block)
+
+        return column
+
+    def grow(self, capacity: int):
+        for name, column in self.columns.items():
+            new_column = self.create_column(name, (capacity,) + column.shape[1:], column.dtype)
+            new_column[:self.count] = column[:self.count]
+            self.columns[name] = new_column
+
+        self.free_pending_blocks()
+
+    def share(self):
+        """
+        Moves every column into shared memory, so worker processes can attach to them without copying.
+        Views taken from the pool before this call no longer point to its data.
+        """
+        if self.shared_blocks is not None:
+            return
+
+        self.shared_blocks = {}
+
+        for name, column in self.columns.items():
+            shared_column = self.create_column(name, column.shape, column.dtype)
+            shared_column[:self.count] = column[:self.count]
+            self.columns[name] = shared_column
+
+    def unshare(self):
+        if self.shared_blocks is None:
+            return
+
+        for name, column in self.columns.items():
+            self.columns[name] = column.copy()
+
+        self.pending_blocks.extend(self.shared_blocks.values())
+        self.shared_blocks = None
+        self.free_pending_blocks()
+
+    def free_pending_blocks(self):
+        for block in self.pending_blocks:
+            block.unlink()
+
+            # Views into the block may still be alive, the memory is then freed along with them
+            try:
+                block.close()
+            except BufferError:
+                pass
+
+        self.pending_blocks = []
+
+    def get_shared_layout(self):
+        """
+        Describes where each column lives in shared memory, as field name -> (block name, shape, dtype).
+        """
+        return {name: (self.shared_blocks[name].name, column.shape, column.dtype.str) for name, column in self.columns.items()}
+
+    def mark_changed(self, slots):
+        if self.clock is not None:
+            self.columns['changed_tick'][slots] = self.clock.get_change_tick()
+
+    def mark_added(self, slot: int):
+        if self.clock is not None:
+            tick = self.clock.get_change_tick()
+            self.columns['added_tick'][slot] = tick
+            self.columns['changed_tick'][slot] = tick
+
+    def allocate(self, component):
+        if self.count == self.get_capacity():
+            self.grow(self.count * 2)
+
+        slot = self.count
+        self.components.append(component)
+        self.count += 1
+        self.version += 1
+
+        return slot
+
+    def adopt(self, component):
+        """
+        Copies the component's data into a new slot of this pool and rebinds the component to it.
+        """
+        slot = self.allocate(component)
+
+        record = component._pool.columns
+        for name in self.dtype.names:
+            self.columns[name][slot] = record[name]
+
+        component._pool = self
+        component._slot = slot
+
+        self.mark_added(slot)
+
+    def release(self, component):
+        """
+        Moves the component's data back into a record of its own so it stays usable on its own,
+        then fills its slot with the last one in the pool.
+        """
+        slot = component._slot
+
+        record = ComponentRecord(self.dtype)
+        for name in self.dtype.names:
+            record.columns[name] = self.columns[name][slot]
+
+        component._pool = record
+        component._slot = ()
+
+        last = self.count - 1
+        if slot != last:
+            for column in self.columns.values():
+                column[slot] = column[last]
+
+            moved_component = self.components[last]
+            moved_component._slot = slot
+            self.components[slot] = moved_component
+
+        self.components.pop()
+        self.count -= 1
+        self.version += 1
+        self.layout_version += 1
+
+class ComponentRecord:
+    """
+    Storage of a pooled component that does not belong to a scene: a single structured NumPy record.
+    Indexed with the empty slot (), so SchemaField reads and writes it exactly like a pool column.
+    """
+
+    __slots__ = ('columns',)
+
+    # Changes of components outside of a scene are not tracked
+    clock = None
+
+    def __init__(self, dtype: np.dtype):
+        self.columns = np.zeros((), dtype=dtype)
+
+class SchemaField:
+    """
+    Attribute of a pooled component that reads and writes straight into its pool column.
+    Shaped fields are returned as NumPy views, so in place edits like transform.translation[0] += 1 reach the pool.
+    Assigning a tracked field also raises the component's dirty flag field, assigning any but a bookkeeping field stamps its change tick.
+    """
+
+    def __init__(self, name: str, is_scalar: bool, dirty_field: str = None, is_bookkeeping: bool = False):
+        self.name = name
+        self.is_scalar = is_scalar
+        self.dirty_field = dirty_field
+        self.is_bookkeeping = is_bookkeeping
+
+    def __get__(self, component, owner = None):
+        if component is None:
+            return self
+
+        value = component._pool.columns[self.name][component._slot]
+
+        return value.item() if self.is_scalar else value
+
+    def __set__(self, component, value):
+        pool = component._pool
+        pool.columns[self.name][component._slot] = value
+
+        if self.dirty_field is not None:
+            pool.columns[self.dirty_field][component._slot] = True
+
+        if not self.is_bookkeeping and pool.clock is not None:
+            pool.columns['changed_tick'][component._slot] = pool.clock.get_change_tick()
+
+class PooledComponent:
+    """
+    Base class for plain data components.
+    Subclasses declare a schema as a list of (name, dtype) or (name, dtype, shape) tuples
+    and the scene keeps their data in a ComponentPool instead of in the component objects.
+    Assigning one of the tracked_fields sets the boolean dirty_field of the component.
+    Assigning any field stamps the component as changed, except for the bookkeeping_fields that systems write for themselves.
+    """
+
+    __slots__ = ('_pool', '_slot')
+
+    schema = []
+    tracked_fields = ()
+    dirty_field = None
+    bookkeeping_fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        cls.dtype = np.dtype(cls.schema)
+
+        for name in cls.dtype.names:
+            dirty_field = cls.dirty_field if name in cls.tracked_fields else None
+            setattr(cls, name, SchemaField(name, cls.dtype.fields[name][0].shape == (), dirty_field, name in cls.bookkeeping_fields))
+
+    def __new__(cls, *args, **kwargs):
+        component = super().__new__(cls)
+
+        # Components live in a record of their own until they get added to a scene
+        component._pool = ComponentRecord(cls.dtype)
+        component._slot = ()
+
+        return component
+
+class ColumnView:
+    """
+    Batch access to the fields of many pooled components, given as a slice or an array of pool slots.
+    Reading a field returns a NumPy array with one row per component, assigning a field writes all rows back to the pool.
+    Fields gathered from scattered slots are copies, flush writes them back so in place edits are kept.
+    Assigning a field stamps every row as changed, in place edits have to be stamped with mark_changed.
+    """
+
+    def __init__(self, pool: ComponentPool, rows):
+        object.__setattr__(self, 'pool', pool)
+        object.__setattr__(self, 'rows', rows)
+        object.__setattr__(self, 'gathered', {})
+
+    def __len__(self):
+        if isinstance(self.rows, slice):
+            return self.rows.stop - self.rows.start
+
+        return len(self.rows)
+
+    def __getattr__(self, name):
+        if name not in self.pool.columns:
+            raise AttributeError(name)
+
+        # Contiguous rows are plain views into the pool
+        if isinstance(self.rows, slice):
+            return self.pool.columns[name][self.rows]
+
+        if name not in self.gathered:
+            self.gathered[name] = self.pool.columns[name][self.rows]
+
+        return self.gathered[name]
+
+    def __setattr__(self, name, value):
+        if name not in self.pool.columns:
+            raise AttributeError(name)
+
+        self.gathered.pop(name, None)
+        self.pool.columns[name][self.rows] = value
+
+        if name not in self.pool.bookkeeping_fields:
+            self.pool.mark_changed(self.rows)
+
+    def get_slots(self, indices = None):
+        """
+        Returns the pool slots of the given rows of the view, or of all of them.
+        """
+        if isinstance(self.rows, slice):
+            slots = np.arange(self.rows.start, self.rows.stop)
+        else:
+            slots = self.rows
+
+        return slots if indices is None else slots[indices]
+
+    def select(self, indices):
+        """
+        Returns a view over a subset of the rows, in the given order.
+        """
+        return ColumnView(self.pool, self.get_slots(indices))
+
+    def mark_changed(self, indices = None):
+        self.pool.mark_changed(self.rows if indices is None else self.get_slots(indices))
+
+    def flush(self):
+        for name, values in self.gathered.items():
+            self.pool.columns[name][self.rows] = values
+
+        self.gathered.clear()
@@ -1,6 +1,66 @@
-import uuid
+INDEX_BITS = 32
+INDEX_MASK = (1 << INDEX_BITS) - 1
+GENERATION_MASK = (1 << 32) - 1
 
 class Entity:
-    def __init__(self):
-        self.id = uuid.uuid4()
+    """
+    A handle made of a 32-bit index and a 32-bit generation, packed together in id.
+    The index can address storage directly, the generation tells apart entities that reused the same index.
+    """
+
+    __slots__ = ('id', 'enabled')
+
+    def __init__(self, index = 0, generation = 0):
+        self.id = (generation << INDEX_BITS) | index
         self.enabled = True
+
+    @property
+    def index(self):
+        return self.id & INDEX_MASK
+
+    @property
+    def generation(self):
+        return self.id >> INDEX_BITS
+
+    def __eq__(self, other):
+        if not isinstance(other, Entity):
+            return NotImplemented
+        return self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f'Entity({self.index}, {self.generation})'
+
+class EntityAllocator:
+    """
+    Hands out entity handles, recycling the indices of released entities from a free list.
+    """
+
+    def __init__(self):
+        self.generations = []
+        self.free_indices = []
+
+    def __len__(self):
+        return len(self.generations) - len(self.free_indices)
+
+    def allocate(self):
+        if self.free_indices:
+            index = self.free_indices.pop()
+        else:
+            index = len(self.generations)
+            self.generations.append(0)
+
+        return Entity(index, self.generations[index])
+
+    def release(self, entity: Entity):
+        index = entity.index
+
+        # Bumping the generation turns every handle still pointing at this index stale
+        self.generations[index] = (self.generations[index] + 1) & GENERATION_MASK
+        self.free_indices.append(index)
+
+    def is_alive(self, entity: Entity):
+        index = entity.index
+        return index < len(self.generations) and self.generations[index] == entity.generation
@@ -0,0 +1,45 @@
+import time
+
+class HeadlessWindow:
+    """
+    A window without a graphics context, for running scenes on machines without a display.
+    Keeps time with perf_counter and runs the main loop until closed, or for max_frames frames when given.
+    """
+
+    def __init__(self, title = '', width = 0, height = 0, vertical_sync = False, max_frames: int = None):
+        self.handle = None
+        self.title = title
+        self.width = width
+        self.height = height
+        self.vertical_sync = vertical_sync
+        self.max_frames = max_frames
+        self.should_close = False
+        self.start_time = 0.0
+
+    def create(self):
+        self.should_close = False
+        self.start_time = time.perf_counter()
+
+    def destroy(self):
+        pass
+
+    def dispatch_main_loop(self, main_loop):
+        frames = 0
+        while not self.should_close and (self.max_frames is None or frames < self.max_frames):
+            main_loop()
+            frames += 1
+
+    def get_handle(self):
+        return self.handle
+
+    def get_time(self):
+        return time.perf_counter() - self.start_time
+
+    def is_headless(self):
+        return True
+
+    def close(self):
+        self.should_close = True
+
+    def set_title(self, title):
+        self.title = title
@@ -363,6 +363,57 @@ def lookatLH(eye, target, up):
     M[2,3] = -np.dot(_f, _eye)
     
     return M
+
+# -------------------- batched transformation functions ----------------------
+
+def rotate_euler_batch(rotations):
+    """Generate one 3x3 rotation matrix per row of euler angles, in one vectorized pass.
+    Each result equals the rotation part of rotate((1, 0, 0), x) @ rotate((0, 1, 0), y) @ rotate((0, 0, 1), z)
+
+    :param rotations: euler angles in degrees, one (x, y, z) row per matrix
+    :type rotations: numpy array of shape (N, 3)
+    :return: rotation matrices
+    :rtype: numpy array of shape (N, 3, 3)
+    """
+    radians = np.radians(np.asarray(rotations, dtype=np.float64))
+    s, c = np.sin(radians), np.cos(radians)
+    ones, zeros = np.ones(len(radians)), np.zeros(len(radians))
+
+    Rx = np.stack([ones, zeros, zeros,
+                   zeros, c[:, 0], -s[:, 0],
+                   zeros, s[:, 0], c[:, 0]], axis=-1).reshape(-1, 3, 3)
+    Ry = np.stack([c[:, 1], zeros, s[:, 1],
+                   zeros, ones, zeros,
+                   -s[:, 1], zeros, c[:, 1]], axis=-1).reshape(-1, 3, 3)
+    Rz = np.stack([c[:, 2], -s[:, 2], zeros,
+                   s[:, 2], c[:, 2], zeros,
+                   zeros, zeros, ones], axis=-1).reshape(-1, 3, 3)
+
+    return Rx @ Ry @ Rz
+
+def compose_transform_batch(translations, rotations, scales):
+    """Generate one 4x4 local transformation matrix per entity, in one vectorized pass.
+    Each result equals scale(s) @ rotate_x @ rotate_y @ rotate_z @ translate(t), as computed per entity by the TransformSystem
+
+    :param translations: one (x, y, z) translation per matrix
+    :type translations: numpy array of shape (N, 3)
+    :param rotations: one (x, y, z) euler rotation in degrees per matrix
+    :type rotations: numpy array of shape (N, 3)
+    :param scales: one (x, y, z) scale per matrix
+    :type scales: numpy array of shape (N, 3)
+    :return: local transformation matrices
+    :rtype: numpy array of shape (N, 4, 4) and type float32
+    """
+    # Scaling from the left multiplies every row of the rotation by the matching scale factor
+    SR = rotate_euler_batch(rotations) * np.asarray(scales, dtype=np.float64)[:, :, np.newaxis]
+
+    matrices = np.zeros((len(SR), 4, 4), dtype=np.float32)
+    matrices[:, :3, :3] = SR
+    matrices[:, :3, 3] = np.einsum('nij,nj->ni', SR, np.asarray(translations, dtype=np.float64))
+    matrices[:, 3, 3] = 1.0
+
+    return matrices
+
 # -------------------- quaternion algebra convenience functions ----------------------
 
 #quaternion()
@@ -49,6 +49,12 @@ class OpenGLWindow:
 
     def get_handle(self):
         return self.handle
+
+    def get_time(self):
+        return glfw.get_time()
+
+    def is_headless(self):
+        return False
     
     def close(self):
         glfw.set_window_should_close(self.handle, True)
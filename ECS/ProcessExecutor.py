@@ -0,0 +1,178 @@
+from ECS.ComponentPool import ColumnView, PooledComponent
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import math
+import os
+
+class SharedColumns:
+    """
+    Columns of a component pool as seen from a worker process, backed by the pool's shared memory blocks.
+    Change ticks are stamped by the main process once the chunks are done.
+    """
+
+    def __init__(self, columns: dict):
+        self.columns = columns
+        self.bookkeeping_fields = frozenset(columns)
+
+# Shared memory blocks a worker process is attached to, keyed by block name
+attached_blocks = {}
+
+def attach_array(block_name: str, shape: tuple, dtype: str):
+    block = attached_blocks.get(block_name)
+
+    if block is None:
+        block = shared_memory.SharedMemory(name=block_name)
+        attached_blocks[block_name] = block
+
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+def close_stale_blocks(live_blocks: frozenset):
+    """
+    Detaches from the blocks the main process no longer uses, their memory is only freed once every process closed them.
+    """
+    for block_name in [block_name for block_name in attached_blocks if block_name not in live_blocks]:
+        block = attached_blocks.pop(block_name)
+
+        # Views into the block may still be alive, the mapping is then closed along with them
+        try:
+            block.close()
+        except BufferError:
+            pass
+
+def run_chunk(system_type: type, ts, start: int, end: int, layouts: list, live_blocks: frozenset):
+    """
+    Runs a system's on_update_chunk over rows [start, end) of its filtered entities, inside a worker process.
+    """
+    close_stale_blocks(live_blocks)
+
+    columns = []
+
+    for layout, rows in layouts:
+        pool = SharedColumns({name: attach_array(*description) for name, description in layout.items()})
+
+        # Rows are either a contiguous range of the pool or an array of slots kept in shared memory too
+        if isinstance(rows, tuple):
+            rows = attach_array(*rows)[start:end]
+        else:
+            rows = slice(rows.start + start, rows.start + end)
+
+        columns.append(ColumnView(pool, rows))
+
+    system_type.on_update_chunk(ts, *columns)
+
+    for column in columns:
+        column.flush()
+
+class ProcessExecutor:
+    """
+    Runs CPU-bound systems in a pool of worker processes.
+    The filtered entity range of a system is split in chunks and every chunk is updated by a worker through the system's
+    on_update_chunk(ts, *columns) static method. Component columns live in shared memory, so no component data gets pickled.
+    Every filtered component type of such a system has to be pooled. Systems with change filters only get the rows that pass them.
+    """
+
+    def __init__(self, workers: int = None, chunk_size: int = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.chunk_size = chunk_size
+        self.shared_pools = []
+        self.slot_blocks = {}
+
+    def share_slots(self, system, index: int, slots):
+        """
+        Copies the slots of a scattered column into shared memory, only when they changed.
+        The block is reused as long as the slots fit in it, a larger one is twice the size of the previous.
+        """
+        key = (id(system), index)
+        cached = self.slot_blocks.get(key)
+
+        if cached is not None and cached[1] is slots:
+            return cached[2]
+
+        block = cached[0] if cached is not None else None
+
+        if block is None or block.size < slots.nbytes:
+            size = max(1, slots.nbytes, 2 * block.size if block is not None else 0)
+
+            if block is not None:
+                block.unlink()
+                block.close()
+
+            block = shared_memory.SharedMemory(create=True, size=size)
+
+        np.ndarray(slots.shape, dtype=slots.dtype, buffer=block.buf)[:] = slots
+
+        description = (block.name, slots.shape, slots.dtype.str)
+        self.slot_blocks[key] = (block, slots, description)
+
+        return description
+
+    def get_live_blocks(self):
+        """
+        Returns the names of every shared memory block in use, workers close their attachments to any other.
+        """
+        block_names = {block.name for block, _, _ in self.slot_blocks.values()}
+
+        for pool in self.shared_pools:
+            block_names.update(block.name for block in pool.shared_blocks.values())
+
+        return frozenset(block_names)
+
+    def run(self, system, ts):
+        for filter in system.filters:
+            if not issubclass(filter, PooledComponent):
+                raise RuntimeError(f'{type(system).__name__} runs in worker processes, but {filter.__name__} is not a pooled component!')
+
+        # Narrowed down to the entities that pass the system's change filters, like on the main process
+        entities, columns = system.get_filtered_rows()
+
+        count = len(entities)
+        if count == 0:
+            return
+
+        layouts = []
+
+        for index, filter in enumerate(system.filters):
+            pool = system.scene.get_component_pool(filter)
+
+            if pool.shared_blocks is None:
+                pool.share()
+                self.shared_pools.append(pool)
+
+            rows = columns[index].rows
+            if not isinstance(rows, slice):
+                rows = self.share_slots(system, index, rows)
+
+            layouts.append((pool.get_shared_layout(), rows))
+
+        chunk_size = self.chunk_size or math.ceil(count / self.workers)
+        live_blocks = self.get_live_blocks()
+
+        futures = [
+            self.executor.submit(run_chunk, type(system), ts, start, min(start + chunk_size, count), layouts, live_blocks)
+            for start in range(0, count, chunk_size)
+        ]
+
+        # Wait for every chunk and surface exceptions raised inside the workers
+        for future in futures:
+            future.result()
+
+        for filter, column in zip(system.filters, columns):
+            if system.writes is None or filter in system.writes:
+                column.mark_changed()
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+        for block, _, _ in self.slot_blocks.values():
+            block.unlink()
+            block.close()
+
+        for pool in self.shared_pools:
+            pool.unshare()
+
+        self.slot_blocks = {}
+        self.shared_pools = []
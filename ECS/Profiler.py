@@ -0,0 +1,119 @@
+from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
+
+import threading
+import time
+import json
+
+class ProfileScope:
+    """
+    Measures the wall time between entering and exiting, then hands it to the profiler.
+    """
+
+    __slots__ = ('profiler', 'name', 'category', 'start')
+
+    def __init__(self, profiler, name: str, category: str):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.record(self.name, self.category, self.start, time.perf_counter())
+        return False
+
+class Profiler(object):
+    """
+    Records the wall time of named scopes (system updates, renderer frames, scene changes).
+    Disabled by default, a disabled profiler hands out a shared no-op scope and records nothing.
+    Keeps a rolling window of durations per scope name for percentiles and every event for a Chrome trace export.
+    """
+
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.instance = super(Profiler, cls).__new__(cls)
+            cls.instance.enabled = False
+            cls.instance.window = 1000
+            cls.instance.durations = {}
+            cls.instance.events = deque(maxlen=1000000)
+            cls.instance.origin = time.perf_counter()
+            cls.instance.null_scope = nullcontext()
+        return cls.instance
+
+    def enable(cls, window: int = 1000, max_events: int = 1000000):
+        """
+        Starts recording, keeping the last window durations of every scope and the last max_events events for the trace.
+        """
+        cls.instance.window = window
+        cls.instance.events = deque(cls.instance.events, maxlen=max_events)
+        cls.instance.enabled = True
+
+    def disable(cls):
+        cls.instance.enabled = False
+
+    def is_enabled(cls):
+        return cls.instance.enabled
+
+    def clear(cls):
+        cls.instance.durations = {}
+        cls.instance.events.clear()
+
+    def scope(cls, name: str, category: str = 'default'):
+        if not cls.instance.enabled:
+            return cls.instance.null_scope
+
+        return ProfileScope(cls.instance, name, category)
+
+    def record(cls, name: str, category: str, start: float, end: float):
+        durations = cls.instance.durations.get(name)
+        if durations is None:
+            durations = cls.instance.durations.setdefault(name, deque(maxlen=cls.instance.window))
+
+        durations.append(end - start)
+        cls.instance.events.append((name, category, start, end, threading.get_ident()))
+
+    def get_percentiles(cls, name: str, percentiles = (50, 95, 99)):
+        """
+        Returns the given percentiles of the recent durations of a scope, in milliseconds.
+        """
+        durations = cls.instance.durations.get(name)
+        if not durations:
+            return None
+
+        values = np.percentile(np.fromiter(durations, dtype=np.float64) * 1000.0, percentiles)
+
+        return {f'p{percentile}': float(value) for percentile, value in zip(percentiles, values)}
+
+    def get_statistics(cls):
+        """
+        Returns p50, p95 and p99 in milliseconds for every recorded scope.
+        """
+        return {name: cls.instance.get_percentiles(name) for name in list(cls.instance.durations)}
+
+    def export_chrome_trace(cls, path: str):
+        """
+        Writes the recorded events as Chrome trace_event JSON, viewable in chrome://tracing or Perfetto.
+        """
+        origin = cls.instance.origin
+
+        trace_events = [
+            {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': (start - origin) * 1000000.0,
+                'dur': (end - start) * 1000000.0,
+                'pid': 0,
+                'tid': thread,
+            }
+            for name, category, start, end, thread in list(cls.instance.events)
+        ]
+
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, file)
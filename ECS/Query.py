@@ -0,0 +1,185 @@
+from ECS.ComponentPool import ColumnView, PooledComponent
+
+from enum import Enum
+
+import numpy as np
+
+class ChangeFilterType(Enum):
+    ADDED = 0
+    CHANGED = 1
+
+class ChangeFilter:
+    """
+    Narrows a query down to the entities whose component of the given type was added or changed since a system last ran.
+    """
+
+    def __init__(self, component_type: type, filter_type: ChangeFilterType):
+        self.component_type = component_type
+        self.filter_type = filter_type
+
+def added(component_type: type):
+    return ChangeFilter(component_type, ChangeFilterType.ADDED)
+
+def changed(component_type: type):
+    return ChangeFilter(component_type, ChangeFilterType.CHANGED)
+
+class Query:
+    """
+    The entities that have all of the given component types and none of the excluded ones.
+    Queries are cached by the scene, kept up to date from component add/remove events
+    and shared among every system that asks for the same components.
+    """
+
+    def __init__(self, component_types: tuple, exclude: frozenset):
+        self.component_types = component_types
+        self.exclude = exclude
+        self.entities = []
+        self.components = []
+        self.entity_indices = {}
+        self.version = 0
+        # (key, rows per component type), replaced as a whole so systems sharing the query on other threads never see it half built
+        self.cached_columns = (None, None)
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __iter__(self):
+        return zip(self.entities, self.components)
+
+    def has_entity(self, entity):
+        return entity.id in self.entity_indices
+
+    def matches(self, scene, entity):
+        if not scene.has_components(entity, self.component_types):
+            return False
+
+        return not any(scene.has_component(entity, component_type) for component_type in self.exclude)
+
+    def populate(self, scene):
+        dense_types = [component_type for component_type in self.component_types if not scene.is_sparse_component(component_type)]
+        needs_entity_check = len(dense_types) != len(self.component_types) or len(self.exclude) > 0
+
+        # Walk the archetype tables that contain every queried component type, column by column
+        for archetype in scene.get_archetypes():
+            if not archetype.matches(dense_types):
+                continue
+
+            # Sparse set and excluded components are not visible from the archetype, check those per entity
+            if needs_entity_check:
+                for entity in archetype.entities:
+                    if self.matches(scene, entity):
+                        self.add(entity, scene.get_components(entity, self.component_types))
+            else:
+                columns = [archetype.get_column(component_type) for component_type in self.component_types]
+
+                for entity, components in zip(archetype.entities, zip(*columns)):
+                    self.add(entity, components)
+
+    def update(self, scene, entity):
+        """
+        Re-evaluates a single entity after one of the query's component types was added to or removed from it.
+        """
+        if not self.matches(scene, entity):
+            self.remove(entity)
+            return
+
+        components = scene.get_components(entity, self.component_types)
+        index = self.entity_indices.get(entity.id)
+
+        if index is None:
+            self.add(entity, components)
+        elif any(current is not new for current, new in zip(self.components[index], components)):
+            # One of the entity's components got replaced
+            self.components[index] = components
+            self.version += 1
+
+    def add(self, entity, components):
+        if (entity.id in self.entity_indices):
+            return
+
+        self.entity_indices[entity.id] = len(self.entities)
+        self.components.append(components)
+        self.entities.append(entity)
+        self.version += 1
+
+    def remove(self, entity):
+        index = self.entity_indices.pop(entity.id, None)
+
+        if index is None:
+            return False
+
+        # Move the last entity into the freed index instead of shifting every entity after it
+        last = len(self.entities) - 1
+        if index != last:
+            moved_entity = self.entities[last]
+            self.entities[index] = moved_entity
+            self.components[index] = self.components[last]
+            self.entity_indices[moved_entity.id] = index
+
+        self.entities.pop()
+        self.components.pop()
+        self.version += 1
+
+        return True
+
+    def get_columns(self, scene):
+        """
+        Returns one column per component type, lined up with the entities.
+        Pooled component types get a ColumnView over their pool, other types a list of the component objects.
+        """
+        pools = [scene.get_component_pool(component_type) if issubclass(component_type, PooledComponent) else None for component_type in self.component_types]
+        key = (self.version, tuple(pool.layout_version if pool is not None else 0 for pool in pools))
+
+        # Rebuild the columns only when the query's entities or the layout of a pool changed
+        cached_key, columns = self.cached_columns
+        if cached_key != key:
+            columns = []
+
+            for index, pool in enumerate(pools):
+                if pool is None:
+                    columns.append([components[index] for components in self.components])
+                    continue
+
+                slots = np.fromiter((components[index]._slot for components in self.components), dtype=np.intp, count=len(self.components))
+
+                # Slots that follow each other can be handed out as a view instead of being gathered
+                if len(slots) > 0 and slots[-1] - slots[0] == len(slots) - 1 and np.all(np.diff(slots) == 1):
+                    slots = slice(int(slots[0]), int(slots[-1]) + 1)
+
+                columns.append(slots)
+
+            self.cached_columns = (key, columns)
+
+        return [ColumnView(pool, rows) if pool is not None else rows for pool, rows in zip(pools, columns)]
+
+    def get_changed_rows(self, scene, filters: list, since_tick: int):
+        """
+        Returns the indices of the entities that pass every change filter, for changes stamped after the given tick.
+        """
+        for filter in filters:
+            if filter.component_type not in self.component_types:
+                raise RuntimeError(f'Change filter on {filter.component_type.__name__}, which is not one of the queried component types!')
+
+        if len(self.entities) == 0:
+            return np.empty(0, dtype=np.intp)
+
+        columns = self.get_columns(scene)
+        is_passing = np.ones(len(self.entities), dtype=np.bool_)
+
+        for filter in filters:
+
+            index = self.component_types.index(filter.component_type)
+            column = columns[index]
+
+            if isinstance(column, ColumnView):
+                tick_name = 'added_tick' if filter.filter_type is ChangeFilterType.ADDED else 'changed_tick'
+                ticks = column.pool.columns[tick_name][column.rows]
+            else:
+                tick_index = 0 if filter.filter_type is ChangeFilterType.ADDED else 1
+                # No entry yet if no component of the type was ever added
+                component_ticks = scene.component_ticks.get(filter.component_type, {})
+                ticks = np.fromiter((component_ticks[entity.id][tick_index] for entity in self.entities), dtype=np.uint64, count=len(self.entities))
+
+            is_passing &= ticks > since_tick
+
+        return np.flatnonzero(is_passing)
@@ -0,0 +1,88 @@
+from ECS.Renderer.RenderCommand import RenderCommand, BufferType, VertexAttribute
+
+import numpy as np
+
+class InstanceBatch:
+    """
+    Every entity drawn with the same shared mesh and material.
+    The model matrices are streamed into one per instance buffer, read by the shader's mat4 instance attribute,
+    and all instances are drawn with a single instanced draw call.
+    """
+
+    def __init__(self, shader_program, textures: list, mesh, instance_location: int, max_instances: int = 1024):
+        self.shader_program = shader_program
+        self.textures = textures
+        self.mesh = mesh
+        self.instance_location = instance_location
+
+        self.instance_count = 0
+        self.capacity = 0
+        self.models = None
+
+        self.vao = 0
+        self.instance_vbo = 0
+
+        self.create(max_instances)
+
+    def create(self, max_instances: int):
+        self.instance_vbo = RenderCommand.create_buffer(BufferType.VERTEX, 0)
+
+        # Per vertex data comes from the mesh buffers shared with other batches
+        attributes = [VertexAttribute(index, vbo, size) for index, (size, vbo) in enumerate(zip(self.mesh.attribute_sizes, self.mesh.vbos))]
+
+        # A mat4 attribute takes four locations, one per row of the model matrix, advancing once per instance
+        for row in range(4):
+            attributes.append(VertexAttribute(self.instance_location + row, self.instance_vbo, 4, 64, row * 16, 1))
+
+        self.vao = RenderCommand.create_vertex_array(attributes, self.mesh.ebo)
+
+        self.reserve(max_instances)
+
+    def reserve(self, max_instances: int):
+        """
+        (Re)allocates the model matrix staging array and the instance buffer, keeping what was already appended.
+        """
+        models = np.zeros((max_instances, 4, 4), dtype=np.float32)
+        if self.models is not None:
+            models[:self.instance_count] = self.models[:self.instance_count]
+
+        self.models = models
+        self.capacity = max_instances
+
+        RenderCommand.resize_buffer(BufferType.VERTEX, self.instance_vbo, max_instances * 64)
+
+    def is_empty(self):
+        return self.instance_count == 0
+
+    def has_room(self, render_data):
+        # The instance buffer grows instead, so all instances keep going out in one draw call
+        return True
+
+    def grow(self, render_data):
+        self.reserve(self.capacity * 2)
+
+    def append(self, model, render_data):
+        if self.instance_count == self.capacity:
+            self.grow(render_data)
+
+        # Uploaded row major like the model uniform, so the shaders use the instance attribute exactly like it
+        self.models[self.instance_count] = model
+        self.instance_count += 1
+
+    def flush(self):
+        """
+        Uploads the model matrices and draws every instance. Returns the number of draw calls issued.
+        """
+        if self.is_empty():
+            return 0
+
+        RenderCommand.update_buffer(BufferType.VERTEX, self.instance_vbo, self.models[:self.instance_count])
+        RenderCommand.draw_indexed_instanced(self.vao, self.mesh.index_count, self.instance_count)
+
+        self.instance_count = 0
+
+        return 1
+
+    def clean(self):
+        RenderCommand.delete_vertex_array(self.vao)
+        RenderCommand.delete_buffers([self.instance_vbo])
@@ -0,0 +1,124 @@
+from ECS.Renderer.RendererBackend import RendererBackend, BufferType, VertexAttribute
+
+from collections import Counter
+
+import itertools
+import re
+
+class NullRenderer(RendererBackend):
+    """
+    Backend that draws nothing and records every command instead, as (name, arguments) tuples.
+    Lets the renderer run on machines without a GPU, to count draw calls and measure the CPU cost of rendering.
+    Pipelines expose the attributes and uniforms whose names appear in their shader code.
+    """
+
+    def __init__(self, record: bool = True) -> None:
+        self.record = record
+        self.commands = []
+        self.counts = Counter()
+        self.handles = itertools.count(1)
+        self.pipelines = {}
+
+    def submit(self, name: str, *args):
+        self.counts[name] += 1
+        if self.record:
+            self.commands.append((name, args))
+
+    def initialize(self):
+        self.submit('initialize')
+
+    def begin_frame(self, clear_color: tuple):
+        self.submit('begin_frame', clear_color)
+
+    def end_frame(self):
+        self.submit('end_frame')
+
+    def create_pipeline(self, vertex_shader_code: str, fragment_shader_code: str):
+        pipeline = next(self.handles)
+        self.pipelines[pipeline] = (vertex_shader_code, fragment_shader_code)
+        self.submit('create_pipeline', pipeline)
+
+        return pipeline
+
+    def use_pipeline(self, pipeline):
+        self.submit('use_pipeline', pipeline)
+
+    def get_attribute_location(self, pipeline, name: str):
+        # Locations follow the order in which the vertex shader declares its inputs
+        vertex_shader_code, _ = self.pipelines.get(pipeline, ('', ''))
+        inputs = re.findall(r'\bin\s+\w+\s+(\w+)\s*;', vertex_shader_code)
+
+        return inputs.index(name) if name in inputs else -1
+
+    def has_uniform(self, pipeline, name: str):
+        return any(re.search(rf'\b{re.escape(name)}\b', code) for code in self.pipelines.get(pipeline, ()))
+
+    def set_uniform_int_array(self, pipeline, name: str, values):
+        self.submit('set_uniform_int_array', pipeline, name, tuple(values))
+
+    def set_uniform_float(self, pipeline, name: str, value: float):
+        self.submit('set_uniform_float', pipeline, name, value)
+
+    def set_uniform_vec4(self, pipeline, name: str, value: tuple):
+        self.submit('set_uniform_vec4', pipeline, name, value)
+
+    def set_uniform_matrix(self, pipeline, name: str, matrix):
+        self.submit('set_uniform_matrix', pipeline, name)
+
+    def create_buffer(self, buffer_type: BufferType, size: int, data = None, dynamic: bool = True):
+        buffer = next(self.handles)
+        self.submit('create_buffer', buffer_type, buffer, size)
+
+        return buffer
+
+    def resize_buffer(self, buffer_type: BufferType, buffer, size: int):
+        self.submit('resize_buffer', buffer_type, buffer, size)
+
+    def update_buffer(self, buffer_type: BufferType, buffer, data, offset: int = 0):
+        self.submit('update_buffer', buffer_type, buffer, data.nbytes, offset)
+
+    def delete_buffers(self, buffers: list):
+        self.submit('delete_buffers', tuple(buffers))
+
+    def create_vertex_array(self, attributes: list[VertexAttribute], index_buffer):
+        vertex_array = next(self.handles)
+        self.submit('create_vertex_array', vertex_array, len(attributes), index_buffer)
+
+        return vertex_array
+
+    def delete_vertex_array(self, vertex_array):
+        self.submit('delete_vertex_array', vertex_array)
+
+    def create_texture(self, width: int, height: int, pixels: bytes):
+        texture = next(self.handles)
+        self.submit('create_texture', texture, width, height)
+
+        return texture
+
+    def bind_texture(self, unit: int, texture):
+        self.submit('bind_texture', unit, texture)
+
+    def draw(self, vertex_array, vertex_count: int):
+        self.submit('draw', vertex_array, vertex_count)
+
+    def draw_indexed(self, vertex_array, index_count: int):
+        self.submit('draw_indexed', vertex_array, index_count)
+
+    def draw_indexed_instanced(self, vertex_array, index_count: int, instance_count: int):
+        self.submit('draw_indexed_instanced', vertex_array, index_count, instance_count)
+
+    def get_draw_calls(self):
+        return self.counts['draw'] + self.counts['draw_indexed'] + self.counts['draw_indexed_instanced']
+
+    def get_command_counts(self):
+        return dict(self.counts)
+
+    def clear(self):
+        """
+        Drops the recorded commands and counts, resources created so far stay valid.
+        """
+        self.commands = []
+        self.counts = Counter()
+
+    def clean(self):
+        self.submit('clean')
@@ -1,9 +1,197 @@
-class OpenGLRenderer:
+from ECS.Renderer.RendererBackend import RendererBackend, BufferType, VertexAttribute
+from ECS.Renderer.RenderState import RenderState
+
+import OpenGL.GL as gl
+import numpy as np
+
+import ctypes
+
+class OpenGLRenderer(RendererBackend):
+    """
+    OpenGL implementation of the backend. Pipelines are shader programs, vertex arrays are VAOs.
+    Binds go through the RenderState, which skips the ones that would not change anything.
+    Buffer uploads always go through GL_ARRAY_BUFFER, binding an index buffer would change the bound VAO.
+    """
+
     def __init__(self) -> None:
+        self.uniform_locations = {}
+
+    def initialize(self):
+        gl.glEnable(gl.GL_DEPTH_TEST)
+
+    def begin_frame(self, clear_color: tuple):
+        gl.glClearColor(*clear_color)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
+
+    def end_frame(self):
+        # The window swaps the buffers
         pass
 
-    def draw(self):
-        print('OpenGLRenderer draw')
+    def compile_shader(self, source, shader_type):
+        shader = gl.glCreateShader(shader_type)
+        gl.glShaderSource(shader, source)
+        gl.glCompileShader(shader)
+
+        if not gl.glGetShaderiv(shader, gl.GL_COMPILE_STATUS):
+            raise RuntimeError(gl.glGetShaderInfoLog(shader).decode('utf-8'))
+
+        return shader
+
+    def create_pipeline(self, vertex_shader_code: str, fragment_shader_code: str):
+        vertex_shader = self.compile_shader(vertex_shader_code, gl.GL_VERTEX_SHADER)
+        fragment_shader = self.compile_shader(fragment_shader_code, gl.GL_FRAGMENT_SHADER)
+
+        shader_program = gl.glCreateProgram()
+        gl.glAttachShader(shader_program, vertex_shader)
+        gl.glAttachShader(shader_program, fragment_shader)
+        gl.glLinkProgram(shader_program)
+
+        if not gl.glGetProgramiv(shader_program, gl.GL_LINK_STATUS):
+            raise RuntimeError(gl.glGetProgramInfoLog(shader_program).decode('utf-8'))
+
+        gl.glDeleteShader(vertex_shader)
+        gl.glDeleteShader(fragment_shader)
+
+        self.cache_uniform_locations(shader_program)
+
+        return shader_program
+
+    def cache_uniform_locations(self, shader_program):
+        """
+        Looks up the locations of all active uniforms of a freshly linked program once, instead of on every use.
+        """
+        locations = self.uniform_locations.setdefault(shader_program, {})
+
+        for index in range(gl.glGetProgramiv(shader_program, gl.GL_ACTIVE_UNIFORMS)):
+            name = gl.glGetActiveUniform(shader_program, index)[0]
+            name = name.decode('utf-8') if isinstance(name, bytes) else name
+
+            location = gl.glGetUniformLocation(shader_program, name)
+            locations[name] = location
+
+            # Arrays are reported by their first element, but set through their name
+            if name.endswith('[0]'):
+                locations[name[:-3]] = location
+
+    def get_uniform_location(self, shader_program, name: str):
+        """
+        Returns the cached location of a uniform, looked up once for names the program was not linked with. -1 if it does not exist.
+        """
+        locations = self.uniform_locations.setdefault(shader_program, {})
+
+        location = locations.get(name)
+        RenderState().count('uniform_location', location is None)
+
+        if location is None:
+            location = gl.glGetUniformLocation(shader_program, name)
+            locations[name] = location
+
+        return location
+
+    def use_pipeline(self, pipeline):
+        RenderState().use_program(pipeline)
+
+    def get_attribute_location(self, pipeline, name: str):
+        return gl.glGetAttribLocation(pipeline, name)
+
+    def has_uniform(self, pipeline, name: str):
+        return self.get_uniform_location(pipeline, name) != -1
+
+    def set_uniform_int_array(self, pipeline, name: str, values):
+        RenderState().use_program(pipeline)
+        gl.glUniform1iv(self.get_uniform_location(pipeline, name), len(values), np.asarray(values, dtype=np.int32))
+
+    def set_uniform_float(self, pipeline, name: str, value: float):
+        RenderState().use_program(pipeline)
+        gl.glUniform1f(self.get_uniform_location(pipeline, name), value)
+
+    def set_uniform_vec4(self, pipeline, name: str, value: tuple):
+        RenderState().use_program(pipeline)
+        gl.glUniform4f(self.get_uniform_location(pipeline, name), *value)
+
+    def set_uniform_matrix(self, pipeline, name: str, matrix):
+        RenderState().use_program(pipeline)
+        gl.glUniformMatrix4fv(self.get_uniform_location(pipeline, name), 1, gl.GL_FALSE, matrix)
+
+    def create_buffer(self, buffer_type: BufferType, size: int, data = None, dynamic: bool = True):
+        buffer = gl.glGenBuffers(1)
+
+        RenderState().bind_buffer(gl.GL_ARRAY_BUFFER, buffer)
+        gl.glBufferData(gl.GL_ARRAY_BUFFER, size, data, gl.GL_DYNAMIC_DRAW if dynamic else gl.GL_STATIC_DRAW)
+
+        return buffer
+
+    def resize_buffer(self, buffer_type: BufferType, buffer, size: int):
+        RenderState().bind_buffer(gl.GL_ARRAY_BUFFER, buffer)
+        gl.glBufferData(gl.GL_ARRAY_BUFFER, size, None, gl.GL_DYNAMIC_DRAW)
+
+    def update_buffer(self, buffer_type: BufferType, buffer, data, offset: int = 0):
+        RenderState().bind_buffer(gl.GL_ARRAY_BUFFER, buffer)
+        gl.glBufferSubData(gl.GL_ARRAY_BUFFER, offset, data.nbytes, data)
+
+    def delete_buffers(self, buffers: list):
+        RenderState().delete_buffers(buffers)
+
+    def create_vertex_array(self, attributes: list[VertexAttribute], index_buffer):
+        vertex_array = gl.glGenVertexArrays(1)
+        RenderState().bind_vertex_array(vertex_array)
+
+        for attribute in attributes:
+            RenderState().bind_buffer(gl.GL_ARRAY_BUFFER, attribute.buffer)
+            gl.glEnableVertexAttribArray(attribute.location)
+            gl.glVertexAttribPointer(attribute.location, attribute.size, gl.GL_FLOAT, gl.GL_FALSE, attribute.stride, ctypes.c_void_p(attribute.offset))
+
+            if attribute.divisor != 0:
+                gl.glVertexAttribDivisor(attribute.location, attribute.divisor)
+
+        RenderState().bind_buffer(gl.GL_ELEMENT_ARRAY_BUFFER, index_buffer)
+
+        return vertex_array
+
+    def delete_vertex_array(self, vertex_array):
+        RenderState().delete_vertex_array(vertex_array)
+
+    def create_texture(self, width: int, height: int, pixels: bytes):
+        texture = gl.glGenTextures(1)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, texture)
+        RenderState().invalidate_texture_unit(0)
+
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_S, gl.GL_REPEAT)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_T, gl.GL_REPEAT)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_LINEAR)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_LINEAR)
+
+        gl.glTexImage2D(
+            gl.GL_TEXTURE_2D,                               #Target
+            0,                                              # Level
+            gl.GL_RGBA8,                                    # Internal Format
+            width,                                          # Width
+            height,                                         # Height
+            0,                                              # Border
+            gl.GL_RGBA,                                     # Format
+            gl.GL_UNSIGNED_BYTE,                            # Type
+            pixels                                          # Data
+        )
+
+        gl.glGenerateMipmap(gl.GL_TEXTURE_2D)
+
+        return texture
+
+    def bind_texture(self, unit: int, texture):
+        RenderState().bind_texture_unit(unit, texture)
+
+    def draw(self, vertex_array, vertex_count: int):
+        RenderState().bind_vertex_array(vertex_array)
+        gl.glDrawArrays(gl.GL_TRIANGLES, 0, vertex_count)
+
+    def draw_indexed(self, vertex_array, index_count: int):
+        RenderState().bind_vertex_array(vertex_array)
+        gl.glDrawElements(gl.GL_TRIANGLES, index_count, gl.GL_UNSIGNED_INT, None)
+
+    def draw_indexed_instanced(self, vertex_array, index_count: int, instance_count: int):
+        RenderState().bind_vertex_array(vertex_array)
+        gl.glDrawElementsInstanced(gl.GL_TRIANGLES, index_count, gl.GL_UNSIGNED_INT, None, instance_count)
 
-    def draw_indexed(self):
-        print('OpenGLRenderer draw_indexed')
\ No newline at end of file
+    def clean(self):
+        # Shader programs outlive the renderer's resources, along with their uniform locations
+        RenderState().reset()
@@ -0,0 +1,130 @@
+from ECS.Renderer.RenderCommand import RenderCommand, BufferType, VertexAttribute
+
+import numpy as np
+
+class RenderBatch:
+    """
+    Geometry of every entity drawn with the same material and vertex layout.
+    Vertices are transformed to world space on the CPU and appended to staging arrays,
+    a flush uploads them into persistent GPU buffers and draws all of them with a single indexed draw call.
+    """
+
+    def __init__(self, shader_program, textures: list, attribute_sizes: tuple, max_vertices: int):
+        self.shader_program = shader_program
+        self.textures = textures
+        self.attribute_sizes = attribute_sizes
+
+        self.vertex_count = 0
+        self.index_count = 0
+        self.capacity = 0
+        self.index_capacity = 0
+
+        self.vertices = []
+        self.indices = None
+
+        self.vao = 0
+        self.vbos = []
+        self.ebo = 0
+
+        self.create(max_vertices)
+
+    def create(self, max_vertices: int):
+        for size in self.attribute_sizes:
+            self.vbos.append(RenderCommand.create_buffer(BufferType.VERTEX, 0))
+
+        self.ebo = RenderCommand.create_buffer(BufferType.INDEX, 0)
+
+        self.vao = RenderCommand.create_vertex_array(
+            [VertexAttribute(index, vbo, size) for index, (size, vbo) in enumerate(zip(self.attribute_sizes, self.vbos))],
+            self.ebo
+        )
+
+        self.reserve(max_vertices, max_vertices * 3)
+
+    def reserve(self, max_vertices: int, max_indices: int):
+        """
+        (Re)allocates the staging arrays and the GPU buffers, keeping what was already appended.
+        """
+        vertices = [np.zeros((max_vertices, size), dtype=np.float32) for size in self.attribute_sizes]
+        for new_vertices, old_vertices in zip(vertices, self.vertices):
+            new_vertices[:self.vertex_count] = old_vertices[:self.vertex_count]
+
+        indices = np.zeros(max_indices, dtype=np.uint32)
+        if self.indices is not None:
+            indices[:self.index_count] = self.indices[:self.index_count]
+
+        self.vertices = vertices
+        self.indices = indices
+
+        self.capacity = max_vertices
+        self.index_capacity = max_indices
+
+        for size, vbo in zip(self.attribute_sizes, self.vbos):
+            RenderCommand.resize_buffer(BufferType.VERTEX, vbo, max_vertices * size * 4)
+
+        RenderCommand.resize_buffer(BufferType.INDEX, self.ebo, max_indices * 4)
+
+    def is_empty(self):
+        return self.vertex_count == 0
+
+    def get_counts(self, render_data):
+        vertex_count = len(render_data.attributes[0])
+        return vertex_count, vertex_count if render_data.indices is None else render_data.indices.size
+
+    def has_room(self, render_data):
+        vertex_count, index_count = self.get_counts(render_data)
+        return self.vertex_count + vertex_count <= self.capacity and self.index_count + index_count <= self.index_capacity
+
+    def grow(self, render_data):
+        vertex_count, index_count = self.get_counts(render_data)
+        self.reserve(max(self.capacity, self.vertex_count + vertex_count), max(self.index_capacity, self.index_count + index_count))
+
+    def append(self, model, render_data):
+        """
+        Appends a mesh transformed by the model matrix. Meshes without indices are drawn as a plain triangle list.
+        """
+        attributes, indices = render_data.attributes, render_data.indices
+        positions = attributes[0]
+        vertex_count = len(positions)
+        size = self.attribute_sizes[0]
+
+        # The shaders multiply row vectors from the left, (p * M^T) is the same as M @ p
+        homogeneous = np.zeros((vertex_count, 4), dtype=np.float32)
+        homogeneous[:, :size] = positions
+        homogeneous[:, 3] = 1.0
+
+        start = self.vertex_count
+        end = start + vertex_count
+
+        self.vertices[0][start:end] = (homogeneous @ model.T)[:, :size]
+        for vertices, attribute in zip(self.vertices[1:], attributes[1:]):
+            vertices[start:end] = attribute
+
+        mesh_indices = np.arange(vertex_count, dtype=np.uint32) if indices is None else np.asarray(indices, dtype=np.uint32).reshape(-1)
+        self.indices[self.index_count:self.index_count + len(mesh_indices)] = mesh_indices + start
+
+        self.vertex_count = end
+        self.index_count += len(mesh_indices)
+
+    def flush(self):
+        """
+        Uploads the appended geometry and draws it. Returns the number of draw calls issued.
+        """
+        if self.is_empty():
+            return 0
+
+        for vertices, vbo in zip(self.vertices, self.vbos):
+            RenderCommand.update_buffer(BufferType.VERTEX, vbo, vertices[:self.vertex_count])
+
+        RenderCommand.update_buffer(BufferType.INDEX, self.ebo, self.indices[:self.index_count])
+
+        RenderCommand.draw_indexed(self.vao, self.index_count)
+
+        self.vertex_count = 0
+        self.index_count = 0
+
+        return 1
+
+    def clean(self):
+        RenderCommand.delete_vertex_array(self.vao)
+        RenderCommand.delete_buffers(self.vbos + [self.ebo])
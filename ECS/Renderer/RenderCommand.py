@@ -1,5 +1,4 @@
-from ECS.Renderer.OpenGLRenderer import OpenGLRenderer
-from ECS.Renderer.WebGPURenderer import WebGPURenderer
+from ECS.Renderer.RendererBackend import BufferType, VertexAttribute
 
 from enum import Enum
 
@@ -7,95 +6,126 @@ class RendererAPI(Enum):
     NONE = 0
     OPENGL = 1
     WEBGPU = 2
+    NULL = 3
 
 class RenderCommand:
+    """
+    Entry point of the renderer to the graphics API, every command is forwarded to the backend picked on initialize.
+    """
+
     API : RendererAPI = RendererAPI.NONE
-    RENDERER = None       
+    RENDERER = None
+
+    @staticmethod
+    def create_backend(api):
+        # Backends are imported only once picked, so running headless on the null backend never loads OpenGL.
+        # WebGPURenderer gets added once it implements the backend
+        if api is RendererAPI.OPENGL:
+            from ECS.Renderer.OpenGLRenderer import OpenGLRenderer
+            return OpenGLRenderer()
+
+        if api is RendererAPI.NULL:
+            from ECS.Renderer.NullRenderer import NullRenderer
+            return NullRenderer()
+
+        raise RuntimeError(f'No renderer backend for {api}!')
 
     @staticmethod
     def initialize(api):
+        renderer = RenderCommand.create_backend(api)
+        renderer.initialize()
+
         RenderCommand.API = api
+        RenderCommand.RENDERER = renderer
+
+    @staticmethod
+    def get_api():
+        return RenderCommand.API
+
+    @staticmethod
+    def begin_frame(clear_color: tuple):
+        RenderCommand.RENDERER.begin_frame(clear_color)
+
+    @staticmethod
+    def end_frame():
+        RenderCommand.RENDERER.end_frame()
+
+    @staticmethod
+    def create_pipeline(vertex_shader_code: str, fragment_shader_code: str):
+        return RenderCommand.RENDERER.create_pipeline(vertex_shader_code, fragment_shader_code)
 
-        if (RenderCommand.API == RendererAPI.OPENGL):
-            RenderCommand.RENDERER = OpenGLRenderer()
-        elif (RenderCommand.API == RendererAPI.WEBGPU):
-            RenderCommand.RENDERER = WebGPURenderer()
+    @staticmethod
+    def use_pipeline(pipeline):
+        RenderCommand.RENDERER.use_pipeline(pipeline)
 
-        if hasattr(RenderCommand.RENDERER, 'initialize') and callable(getattr(RenderCommand.RENDERER, 'initialize')):
-            RenderCommand.RENDERER.initialize()
-        else:
-            print(f'initialize method not implemented in {RenderCommand.API}')
+    @staticmethod
+    def get_attribute_location(pipeline, name: str):
+        return RenderCommand.RENDERER.get_attribute_location(pipeline, name)
 
-        ##### WebGPU #####
-        # request adapter
-        # request device
-        # get - configure present context
-        ##################
+    @staticmethod
+    def has_uniform(pipeline, name: str):
+        return RenderCommand.RENDERER.has_uniform(pipeline, name)
 
-        ### OpenGL ###
-        # set settings
-        ##############
+    @staticmethod
+    def set_uniform_int_array(pipeline, name: str, values):
+        RenderCommand.RENDERER.set_uniform_int_array(pipeline, name, values)
+
+    @staticmethod
+    def set_uniform_float(pipeline, name: str, value: float):
+        RenderCommand.RENDERER.set_uniform_float(pipeline, name, value)
 
-        pass
+    @staticmethod
+    def set_uniform_vec4(pipeline, name: str, value: tuple):
+        RenderCommand.RENDERER.set_uniform_vec4(pipeline, name, value)
 
     @staticmethod
-    def create_bind_group_layout():
-        pass
+    def set_uniform_matrix(pipeline, name: str, matrix):
+        RenderCommand.RENDERER.set_uniform_matrix(pipeline, name, matrix)
 
     @staticmethod
-    def create_bind_group():
-        pass
-    
+    def create_buffer(buffer_type: BufferType, size: int, data = None, dynamic: bool = True):
+        return RenderCommand.RENDERER.create_buffer(buffer_type, size, data, dynamic)
+
     @staticmethod
-    def create_pipeline_layout():
-        pass
+    def resize_buffer(buffer_type: BufferType, buffer, size: int):
+        RenderCommand.RENDERER.resize_buffer(buffer_type, buffer, size)
 
     @staticmethod
-    def create_render_pipeline():
-        pass
+    def update_buffer(buffer_type: BufferType, buffer, data, offset: int = 0):
+        RenderCommand.RENDERER.update_buffer(buffer_type, buffer, data, offset)
 
     @staticmethod
-    def begin_frame():
-        ##### WebGPU #####
-        # get present context texture
-        # create command encoder
-        # begin renderpass
-        ##################
+    def delete_buffers(buffers: list):
+        RenderCommand.RENDERER.delete_buffers(buffers)
 
-        ### OpenGL ###
-        # clear screen
-        ##############
+    @staticmethod
+    def create_vertex_array(attributes: list[VertexAttribute], index_buffer):
+        return RenderCommand.RENDERER.create_vertex_array(attributes, index_buffer)
 
-        pass
+    @staticmethod
+    def delete_vertex_array(vertex_array):
+        RenderCommand.RENDERER.delete_vertex_array(vertex_array)
 
     @staticmethod
-    def end_frame():
-        ##### WebGPU #####
-        # end render pass
-        # submit commands
-        # request draw
-        ##################
+    def create_texture(width: int, height: int, pixels: bytes):
+        return RenderCommand.RENDERER.create_texture(width, height, pixels)
 
-        ### OpenGL ###
-        # swap buffers
-        ##############
+    @staticmethod
+    def bind_texture(unit: int, texture):
+        RenderCommand.RENDERER.bind_texture(unit, texture)
 
-        pass
+    @staticmethod
+    def draw(vertex_array, vertex_count: int):
+        RenderCommand.RENDERER.draw(vertex_array, vertex_count)
 
     @staticmethod
-    def draw():
-        if hasattr(RenderCommand.RENDERER, 'draw') and callable(getattr(RenderCommand.RENDERER, 'draw')):
-            RenderCommand.RENDERER.draw()
-        else:
-            print(f'draw method not implemented in {RenderCommand.API}')
+    def draw_indexed(vertex_array, index_count: int):
+        RenderCommand.RENDERER.draw_indexed(vertex_array, index_count)
 
     @staticmethod
-    def draw_indexed():
-        if hasattr(RenderCommand.RENDERER, 'draw_indexed') and callable(getattr(RenderCommand.RENDERER, 'draw_indexed')):
-            RenderCommand.RENDERER.draw_indexed()
-        else:
-            print(f'draw_indexed method not implemented in {RenderCommand.API}')
+    def draw_indexed_instanced(vertex_array, index_count: int, instance_count: int):
+        RenderCommand.RENDERER.draw_indexed_instanced(vertex_array, index_count, instance_count)
 
     @staticmethod
     def clean():
-        pass
\ No newline at end of file
+        RenderCommand.RENDERER.clean()
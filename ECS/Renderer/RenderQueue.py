@@ -0,0 +1,54 @@
+import numpy as np
+
+class RenderPacket:
+    """
+    Everything needed to draw one entity, submitted to the render queue instead of being drawn right away.
+    """
+
+    __slots__ = ('model', 'render_data', 'batch')
+
+    def __init__(self, model, render_data, batch):
+        self.model = model
+        self.render_data = render_data
+        self.batch = batch
+
+class RenderQueue:
+    """
+    Collects the draw packets of a frame along with a 64 bit sort key each: 16 bits of shader, material, texture and depth,
+    from the most to the least significant. Sorting by the key brings together the packets that share state,
+    so state changes only happen between groups, and orders packets front to back within a group.
+    """
+
+    DEPTH_BITS = 16
+
+    def __init__(self, near: float = 0.1, far: float = 100.0):
+        self.near = near
+        self.far = far
+        self.keys = []
+        self.packets = []
+
+    def __len__(self):
+        return len(self.packets)
+
+    @staticmethod
+    def make_key(shader: int, material: int, texture: int, depth: int = 0):
+        return ((shader & 0xFFFF) << 48) | ((material & 0xFFFF) << 32) | ((texture & 0xFFFF) << 16) | (depth & 0xFFFF)
+
+    def quantize_depth(self, depth: float):
+        normalized = (depth - self.near) / (self.far - self.near)
+        return int(min(max(normalized, 0.0), 1.0) * ((1 << self.DEPTH_BITS) - 1))
+
+    def submit(self, key: int, model, render_data, batch):
+        self.keys.append(key)
+        self.packets.append(RenderPacket(model, render_data, batch))
+
+    def sort(self):
+        """
+        Returns the packets in key order, packets with equal keys keep their submission order.
+        """
+        order = np.argsort(np.array(self.keys, dtype=np.uint64), kind='stable')
+        return [self.packets[index] for index in order]
+
+    def clear(self):
+        self.keys = []
+        self.packets = []
@@ -0,0 +1,103 @@
+import OpenGL.GL as gl
+
+class RenderState(object):
+    """
+    Shadows the bound shader program, vertex array, buffers and texture units, so binding what is already bound
+    costs no call into OpenGL. Only valid as long as every bind of the renderer goes through it.
+    Counts the calls issued and skipped per kind of state change, to verify the savings.
+    """
+
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.instance = super(RenderState, cls).__new__(cls)
+            cls.instance.program = None
+            cls.instance.vertex_array = None
+            cls.instance.buffers = {}
+            cls.instance.texture_units = {}
+            cls.instance.issued = {}
+            cls.instance.skipped = {}
+        return cls.instance
+
+    def count(cls, kind: str, issued: bool):
+        counters = cls.instance.issued if issued else cls.instance.skipped
+        counters[kind] = counters.get(kind, 0) + 1
+
+    def use_program(cls, program):
+        if cls.instance.program == program:
+            cls.instance.count('program', False)
+            return
+
+        gl.glUseProgram(program)
+        cls.instance.program = program
+        cls.instance.count('program', True)
+
+    def bind_vertex_array(cls, vertex_array):
+        if cls.instance.vertex_array == vertex_array:
+            cls.instance.count('vertex_array', False)
+            return
+
+        gl.glBindVertexArray(vertex_array)
+        cls.instance.vertex_array = vertex_array
+        cls.instance.count('vertex_array', True)
+
+        # The bound index buffer is part of the vertex array's state
+        cls.instance.buffers.pop(gl.GL_ELEMENT_ARRAY_BUFFER, None)
+
+    def bind_buffer(cls, target, buffer):
+        if cls.instance.buffers.get(target) == buffer:
+            cls.instance.count('buffer', False)
+            return
+
+        gl.glBindBuffer(target, buffer)
+        cls.instance.buffers[target] = buffer
+        cls.instance.count('buffer', True)
+
+    def bind_texture_unit(cls, unit: int, texture):
+        if cls.instance.texture_units.get(unit) == texture:
+            cls.instance.count('texture_unit', False)
+            return
+
+        gl.glBindTextureUnit(unit, texture)
+        cls.instance.texture_units[unit] = texture
+        cls.instance.count('texture_unit', True)
+
+    def invalidate_texture_unit(cls, unit: int):
+        """
+        Forgets the texture of a unit that got bound directly, like the active unit while a texture is uploaded.
+        """
+        cls.instance.texture_units.pop(unit, None)
+
+    def delete_vertex_array(cls, vertex_array):
+        gl.glDeleteVertexArrays(1, [vertex_array])
+
+        # Deleting a bound object unbinds it
+        if cls.instance.vertex_array == vertex_array:
+            cls.instance.vertex_array = 0
+            cls.instance.buffers.pop(gl.GL_ELEMENT_ARRAY_BUFFER, None)
+
+    def delete_buffers(cls, buffers: list):
+        gl.glDeleteBuffers(len(buffers), buffers)
+
+        for target, buffer in list(cls.instance.buffers.items()):
+            if buffer in buffers:
+                cls.instance.buffers[target] = 0
+
+    def get_statistics(cls):
+        """
+        Returns the issued and skipped calls per kind of state change.
+        """
+        kinds = sorted(set(cls.instance.issued) | set(cls.instance.skipped))
+        return {kind: {'issued': cls.instance.issued.get(kind, 0), 'skipped': cls.instance.skipped.get(kind, 0)} for kind in kinds}
+
+    def reset_statistics(cls):
+        cls.instance.issued = {}
+        cls.instance.skipped = {}
+
+    def reset(cls):
+        """
+        Forgets the shadowed state, for when something outside of the renderer changed it or the context was recreated.
+        """
+        cls.instance.program = None
+        cls.instance.vertex_array = None
+        cls.instance.buffers = {}
+        cls.instance.texture_units = {}
@@ -1,17 +1,38 @@
 from ECS.Utilities.TextureLib import TextureLib
 from ECS.Math import *
-
-import OpenGL.GL as gl
-
-import ctypes
+from ECS.Profiler import Profiler
+from ECS.Renderer.RenderBatch import RenderBatch
+from ECS.Renderer.InstanceBatch import InstanceBatch
+from ECS.Utilities.MeshLib import MeshLib
+from ECS.Renderer.RenderQueue import RenderQueue
+from ECS.Renderer.RenderCommand import RenderCommand, RendererAPI
 
 class Renderer2D(object):
+    """
+    Batch renderer: entities that share a material and vertex layout are appended to one RenderBatch
+    and drawn together when the frame ends, when their batch is full or when the texture units run out.
+    When the material's shader declares a mat4 a_Model instance attribute, entities with the same geometry share one
+    uploaded mesh instead and are drawn instanced through an InstanceBatch.
+    Draws are submitted to a RenderQueue and executed when the frame ends, sorted by shader, material, texture and depth,
+    so every batch is filled in one go and the shader program is only switched between groups.
+    The GPU is only reached through RenderCommand, so any backend can draw, including the recording NullRenderer.
+    """
+
+    # Name of the per instance model matrix attribute that enables instanced drawing
+    INSTANCE_ATTRIBUTE = 'a_Model'
+
+    # Texture units available to the shaders through u_Textures[32]
+    MAX_TEXTURE_UNITS = 32
+
     def __new__(cls):
         if not hasattr(cls, 'instance'):
             cls.instance = super(Renderer2D, cls).__new__(cls)
-            cls.instance.vbo = []
-            cls.instance.ebo = 0
-            cls.instance.vao = 0
+            cls.instance.batches = {}
+            cls.instance.render_queue = RenderQueue()
+            cls.instance.sort_ids = {}
+            cls.instance.max_vertices = 65536
+            cls.instance.texture_units = {}
+            cls.instance.draw_calls = 0
             cls.instance.initialized = False
         return cls.instance
     
@@ -21,148 +42,160 @@ class Renderer2D(object):
     def is_initialized(cls):
         return cls.instance.initialized
     
-    def initialize(cls):
+    def initialize(cls, api: RendererAPI = RendererAPI.OPENGL):
 
-        # Initialize OpenGL
-        gl.glEnable(gl.GL_DEPTH_TEST)
+        # Pick and initialize the backend
+        RenderCommand.initialize(api)
 
     def add_batch(cls, render_data, material):
-        # Vertex Array Object (VAO)
-        render_data.vao = gl.glGenVertexArrays(1)
-        gl.glBindVertexArray(render_data.vao)
-
-        for index, attribute in enumerate(render_data.attributes):
-            # Get a pointer to the NumPy array data
-            attribute_pointer = attribute.ctypes.data_as(ctypes.POINTER(gl.GLfloat))
-
-            # Vertex Buffer Object (VBO)
-            render_data.vbo.append(gl.glGenBuffers(1))
-            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, render_data.vbo[-1])
-            gl.glBufferData(gl.GL_ARRAY_BUFFER, len(attribute) * len(attribute[0]) * 4, attribute_pointer, gl.GL_STATIC_DRAW)
-
-            gl.glEnableVertexAttribArray(0)
-            gl.glVertexAttribPointer(index, len(attribute[0]), gl.GL_FLOAT, gl.GL_FALSE, len(attribute[0]) * 4, ctypes.c_void_p(0))
-
-        if render_data.indices is not None:
-            # Get a pointer to the NumPy array data
-            indices_pointer = render_data.indices.ctypes.data_as(ctypes.POINTER(gl.GLuint))
-            
-            # Element Buffer Object (EBO)
-            render_data.ebo = gl.glGenBuffers(1)
-            gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, render_data.ebo)
-            gl.glBufferData(gl.GL_ELEMENT_ARRAY_BUFFER, len(render_data.indices) * 3 * 4, indices_pointer, gl.GL_STATIC_DRAW)
-
-        # Use the shader program
-        gl.glUseProgram(material.instance.shader_program)
+        """
+        Returns the batch the entity gets drawn with, created along with its persistent buffers on first use.
+        """
+        shader_program = material.instance.shader_program
+        instance_location = RenderCommand.get_attribute_location(shader_program, cls.INSTANCE_ATTRIBUTE)
+
+        if instance_location != -1:
+            mesh = MeshLib().build(render_data.attributes, render_data.indices)
+            key = (shader_program, tuple(material.instance.textures), mesh)
+        else:
+            attribute_sizes = tuple(len(attribute[0]) for attribute in render_data.attributes)
+            key = (shader_program, tuple(material.instance.textures), attribute_sizes)
+
+        batch = cls.instance.batches.get(key)
+        if batch is not None:
+            return batch
+
+        if instance_location != -1:
+            batch = InstanceBatch(shader_program, material.instance.textures, mesh, instance_location)
+        else:
+            batch = RenderBatch(shader_program, material.instance.textures, attribute_sizes, cls.instance.max_vertices)
+
+        cls.instance.batches[key] = batch
+
+        # Small ids that fit the sort key, handed out in order of first use
+        texture = material.instance.textures[0] if material.instance.textures else None
+        batch.sort_key = RenderQueue.make_key(
+            cls.instance.get_sort_id('shader', shader_program),
+            cls.instance.get_sort_id('material', key),
+            cls.instance.get_sort_id('texture', texture)
+        )
 
         # Create samplers if texture is in use
-        texture_uniform_location = gl.glGetUniformLocation(material.instance.shader_program, "u_Textures")
-        if texture_uniform_location != -1:
+        if RenderCommand.has_uniform(shader_program, "u_Textures"):
             samplers = []
-            for i in range(0, 32):
+            for i in range(0, cls.MAX_TEXTURE_UNITS):
                 samplers.append(i)
 
-            gl.glUniform1iv(texture_uniform_location, 32, np.array(samplers, dtype=np.int32))
+            RenderCommand.set_uniform_int_array(shader_program, "u_Textures", samplers)
         else:
             print(f'Could find u_Textures uniform for material: {material.name}!')
 
-        return 0
+        return batch
+
+    def get_sort_id(cls, kind: str, value):
+        ids = cls.instance.sort_ids.setdefault(kind, {})
+        return ids.setdefault(value, len(ids))
 
     def begin_frame(cls):
-        gl.glClearColor(0.8, 0.5, 0.3, 1.0)
-        gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
+        with Profiler().scope('Renderer2D.begin_frame', 'renderer'):
+            cls.instance.draw_calls = 0
+
+            RenderCommand.begin_frame((0.8, 0.5, 0.3, 1.0))
 
     def end_frame(cls):
-        pass
-    
-    def draw(cls, model, render_data, material):
-        # Bind shader program
-        gl.glUseProgram(material.instance.shader_program)
-        
-        # Bind textures
-        TextureLib().bind_textures()
-
-        # Set Uniforms
-        gl.glUniformMatrix4fv(gl.glGetUniformLocation(material.instance.shader_program, "model"), 1, gl.GL_FALSE, model)
-        gl.glUniform4f(gl.glGetUniformLocation(material.instance.shader_program, "u_Color"), 1.0, 0.0, 0.0, 1.0)
-
-        if len(material.instance.textures) > 0:
-            texture_id_uniform_location = gl.glGetUniformLocation(material.instance.shader_program, "u_TextureId")
-            if texture_id_uniform_location != -1:
-                gl.glUniform1f(texture_id_uniform_location, TextureLib().get_slot(material.instance.textures[0]))
-            else:
-                print(f'Could find u_TextureId uniform for material: {material.name}!')
+        with Profiler().scope('Renderer2D.end_frame', 'renderer'):
+            cls.instance.execute_render_queue()
 
-        # Bind vao
-        gl.glBindVertexArray(render_data.vao)
+            RenderCommand.end_frame()
 
-        # Bind vertex buffer and their layout
-        for index, attribute in enumerate(render_data.attributes):
-            # Vertex Buffer Object (VBO)
-            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, render_data.vbo[index])
+    def draw(cls, model, render_data, batch, depth: float = 0.0):
+        """
+        Submits a mesh, indexed or not, transformed by the model matrix, to be drawn when the frame ends.
+        Depth is the distance from the camera, nearer meshes are drawn first within their batch.
+        """
+        render_queue = cls.instance.render_queue
 
-            # Set vertex buffer layout
-            gl.glEnableVertexAttribArray(index)
-            gl.glVertexAttribPointer(index, len(attribute[0]), gl.GL_FLOAT, gl.GL_FALSE, len(attribute[0]) * 4, ctypes.c_void_p(0))
+        # Copied, since the transform's slot might hold another entity's data once the frame ends
+        render_queue.submit(batch.sort_key | render_queue.quantize_depth(depth), np.array(model), render_data, batch)
 
-        gl.glDrawArrays(gl.GL_TRIANGLES, 0, len(render_data.attributes[0]) * 3)
+    def execute_render_queue(cls):
+        current_batch = None
 
-        # Unbind vao
-        gl.glBindVertexArray(0)
+        for packet in cls.instance.render_queue.sort():
+            batch = packet.batch
 
-        # Unbind textures
-        TextureLib().unbind_textures()
+            # Packets of a batch follow each other, so it gets drawn once they are all in, unless it fills up before
+            if batch is not current_batch:
+                if current_batch is not None:
+                    cls.instance.flush_batch(current_batch)
 
-        # Unbind shader program
-        gl.glUseProgram(0)
+                # Textures of the batch need a unit, when none is left everything queued so far gets drawn first
+                cls.instance.acquire_texture_units(batch)
+                current_batch = batch
 
-    def draw_indexed(cls, model, render_data, material):
-        # Bind shader program
-        gl.glUseProgram(material.instance.shader_program)
-        
-        # Bind textures
-        TextureLib().bind_textures()
+            if not batch.has_room(packet.render_data):
+                cls.instance.flush_batch(batch)
 
-        # Set Uniforms
-        gl.glUniformMatrix4fv(gl.glGetUniformLocation(material.instance.shader_program, "model"), 1, gl.GL_FALSE, model)
-        gl.glUniform4f(gl.glGetUniformLocation(material.instance.shader_program, "u_Color"), 1.0, 0.0, 0.0, 1.0)
+                # Whatever does not fit even in an empty batch gets a bigger one
+                if not batch.has_room(packet.render_data):
+                    batch.grow(packet.render_data)
 
-        if len(material.instance.textures) > 0:
-            texture_id_uniform_location = gl.glGetUniformLocation(material.instance.shader_program, "u_TextureId")
-            if texture_id_uniform_location != -1:
-                gl.glUniform1f(texture_id_uniform_location, TextureLib().get_slot(material.instance.textures[0]))
-            else:
-                print(f'Could find u_TextureId uniform for material: {material.name}!')
+            batch.append(packet.model, packet.render_data)
+
+        if current_batch is not None:
+            cls.instance.flush_batch(current_batch)
 
-        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, render_data.ebo)
+        cls.instance.render_queue.clear()
 
-        # Bind vao
-        gl.glBindVertexArray(render_data.vao)
+    def acquire_texture_units(cls, batch):
+        missing_textures = [texture for texture in batch.textures if texture not in cls.instance.texture_units]
+        if not missing_textures:
+            return
 
-        # Bind vertex buffer and their layout
-        for index, attribute in enumerate(render_data.attributes):
-            # Vertex Buffer Object (VBO)
-            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, render_data.vbo[index])
+        if len(cls.instance.texture_units) + len(missing_textures) > cls.MAX_TEXTURE_UNITS:
+            cls.instance.flush()
+            cls.instance.texture_units = {}
+            missing_textures = batch.textures
 
-            # Set vertex buffer layout
-            gl.glEnableVertexAttribArray(index)
-            gl.glVertexAttribPointer(index, len(attribute[0]), gl.GL_FLOAT, gl.GL_FALSE, len(attribute[0]) * 4, ctypes.c_void_p(0))
+        for texture in missing_textures:
+            unit = len(cls.instance.texture_units)
+            cls.instance.texture_units[texture] = unit
+            RenderCommand.bind_texture(unit, TextureLib().get_id(texture))
 
-        gl.glDrawElements(gl.GL_TRIANGLES, len(render_data.indices) * 3, gl.GL_UNSIGNED_INT, None)
+    def flush_batch(cls, batch):
+        if batch.is_empty():
+            return
 
-        # Unbind vao
-        gl.glBindVertexArray(0)
-        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, 0)
+        # Bind shader program, consecutive batches of a shader keep it bound
+        RenderCommand.use_pipeline(batch.shader_program)
 
-        # Unbind textures
-        TextureLib().unbind_textures()
+        # Set Uniforms, the vertices are already in world space or transformed per instance
+        RenderCommand.set_uniform_matrix(batch.shader_program, "model", identity())
+        RenderCommand.set_uniform_vec4(batch.shader_program, "u_Color", (1.0, 0.0, 0.0, 1.0))
 
-        # Unbind shader program
-        gl.glUseProgram(0)
+        if len(batch.textures) > 0:
+            if RenderCommand.has_uniform(batch.shader_program, "u_TextureId"):
+                RenderCommand.set_uniform_float(batch.shader_program, "u_TextureId", cls.instance.texture_units[batch.textures[0]])
+            else:
+                print(f'Could find u_TextureId uniform for shader program: {batch.shader_program}!')
+
+        cls.instance.draw_calls += batch.flush()
+
+    def flush(cls):
+        for batch in cls.instance.batches.values():
+            cls.instance.flush_batch(batch)
+
+    def get_draw_calls(cls):
+        return cls.instance.draw_calls
 
     def clean(cls):
-        #gl.glDeleteVertexArrays(1, (cls.instance.vao,))
-        #gl.glDeleteBuffers(len(cls.instance.vbo), cls.instance.vbo)
-        #gl.glDeleteBuffers(1, (cls.instance.ebo,))
-        pass
+        for batch in cls.instance.batches.values():
+            batch.clean()
+
+        cls.instance.batches = {}
+        cls.instance.texture_units = {}
+        cls.instance.sort_ids = {}
+        cls.instance.render_queue.clear()
 
+        MeshLib().clean()
+        RenderCommand.clean()
@@ -0,0 +1,105 @@
+from enum import Enum
+
+class BufferType(Enum):
+    VERTEX = 0
+    INDEX = 1
+
+class VertexAttribute:
+    """
+    Where a vertex attribute location reads its data from: size floats per vertex, or per instance with a divisor of 1.
+    """
+
+    __slots__ = ('location', 'buffer', 'size', 'stride', 'offset', 'divisor')
+
+    def __init__(self, location: int, buffer, size: int, stride: int = None, offset: int = 0, divisor: int = 0):
+        self.location = location
+        self.buffer = buffer
+        self.size = size
+        self.stride = size * 4 if stride is None else stride
+        self.offset = offset
+        self.divisor = divisor
+
+class RendererBackend:
+    """
+    The low level interface every graphics API implements, the renderer only talks to the GPU through it via RenderCommand.
+    Pipelines are linked shader programs, vertex arrays tie vertex buffers to attribute locations along with an index buffer.
+    Handles returned by a backend are opaque to the renderer.
+    """
+
+    def initialize(self):
+        raise NotImplementedError(f'{type(self).__name__} does not implement initialize')
+
+    def begin_frame(self, clear_color: tuple):
+        raise NotImplementedError(f'{type(self).__name__} does not implement begin_frame')
+
+    def end_frame(self):
+        raise NotImplementedError(f'{type(self).__name__} does not implement end_frame')
+
+    def create_pipeline(self, vertex_shader_code: str, fragment_shader_code: str):
+        raise NotImplementedError(f'{type(self).__name__} does not implement create_pipeline')
+
+    def use_pipeline(self, pipeline):
+        raise NotImplementedError(f'{type(self).__name__} does not implement use_pipeline')
+
+    def get_attribute_location(self, pipeline, name: str):
+        """
+        Returns the location of a vertex attribute of the pipeline, -1 if it has none with that name.
+        """
+        raise NotImplementedError(f'{type(self).__name__} does not implement get_attribute_location')
+
+    def has_uniform(self, pipeline, name: str):
+        raise NotImplementedError(f'{type(self).__name__} does not implement has_uniform')
+
+    def set_uniform_int_array(self, pipeline, name: str, values):
+        raise NotImplementedError(f'{type(self).__name__} does not implement set_uniform_int_array')
+
+    def set_uniform_float(self, pipeline, name: str, value: float):
+        raise NotImplementedError(f'{type(self).__name__} does not implement set_uniform_float')
+
+    def set_uniform_vec4(self, pipeline, name: str, value: tuple):
+        raise NotImplementedError(f'{type(self).__name__} does not implement set_uniform_vec4')
+
+    def set_uniform_matrix(self, pipeline, name: str, matrix):
+        raise NotImplementedError(f'{type(self).__name__} does not implement set_uniform_matrix')
+
+    def create_buffer(self, buffer_type: BufferType, size: int, data = None, dynamic: bool = True):
+        raise NotImplementedError(f'{type(self).__name__} does not implement create_buffer')
+
+    def resize_buffer(self, buffer_type: BufferType, buffer, size: int):
+        """
+        Reallocates the storage of a buffer, its previous contents are lost.
+        """
+        raise NotImplementedError(f'{type(self).__name__} does not implement resize_buffer')
+
+    def update_buffer(self, buffer_type: BufferType, buffer, data, offset: int = 0):
+        raise NotImplementedError(f'{type(self).__name__} does not implement update_buffer')
+
+    def delete_buffers(self, buffers: list):
+        raise NotImplementedError(f'{type(self).__name__} does not implement delete_buffers')
+
+    def create_vertex_array(self, attributes: list[VertexAttribute], index_buffer):
+        raise NotImplementedError(f'{type(self).__name__} does not implement create_vertex_array')
+
+    def delete_vertex_array(self, vertex_array):
+        raise NotImplementedError(f'{type(self).__name__} does not implement delete_vertex_array')
+
+    def create_texture(self, width: int, height: int, pixels: bytes):
+        """
+        Creates a repeating, linearly filtered RGBA8 texture with mipmaps.
+        """
+        raise NotImplementedError(f'{type(self).__name__} does not implement create_texture')
+
+    def bind_texture(self, unit: int, texture):
+        raise NotImplementedError(f'{type(self).__name__} does not implement bind_texture')
+
+    def draw(self, vertex_array, vertex_count: int):
+        raise NotImplementedError(f'{type(self).__name__} does not implement draw')
+
+    def draw_indexed(self, vertex_array, index_count: int):
+        raise NotImplementedError(f'{type(self).__name__} does not implement draw_indexed')
+
+    def draw_indexed_instanced(self, vertex_array, index_count: int, instance_count: int):
+        raise NotImplementedError(f'{type(self).__name__} does not implement draw_indexed_instanced')
+
+    def clean(self):
+        raise NotImplementedError(f'{type(self).__name__} does not implement clean')
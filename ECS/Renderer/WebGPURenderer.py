@@ -1,9 +1,15 @@
-class WebGPURenderer:
+from ECS.Renderer.RendererBackend import RendererBackend
+
+class WebGPURenderer(RendererBackend):
+    """
+    WebGPU backend, not implemented yet: every command raises NotImplementedError.
+    """
+
     def __init__(self) -> None:
         self.name = 'WebGPURenderer'
 
-    def draw(self):
-        print(f'WebGPURenderer draw {self.name}')
-
-    def draw_indexed(self):
-        print(f'WebGPURenderer draw_indexed {self.name}')
\ No newline at end of file
+        ##### WebGPU #####
+        # request adapter
+        # request device
+        # get - configure present context
+        ##################
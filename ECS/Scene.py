@@ -1,110 +1,559 @@
-from ECS.Entity import Entity
+from ECS.Entity import Entity, EntityAllocator
+from ECS.Archetype import Archetype
+from ECS.ComponentPool import ComponentPool, PooledComponent
+from ECS.SparseSet import SparseSet
+from ECS.Query import Query
+from ECS.CommandBuffer import CommandBuffer
+from ECS.System import UpdatePhase
+
+from enum import Enum
+
+import itertools
+import threading
+
+class StorageType(Enum):
+    ARCHETYPE = 0
+    SPARSE_SET = 1
 
 class Scene():
     def __init__(self):
-        self.entity_components = {}
-        self.component_arrays = {}
-        self.entities = []
+        self.archetypes = {}
+        self.entity_allocator = EntityAllocator()
+        self.entity_locations = []
+        self.component_pools = {}
+        self.pool_lock = threading.Lock()
+        self.sparse_sets = {}
+        self.entities = {}
+        self.queries = {}
+        self.queries_by_type = {}
         self.systems = []
-    
-    def enroll_entity(self):
-        entity = Entity()
-        self.entities.append(entity)
+
+        # Stamped on components when they are added or changed, advanced before and after every system run.
+        # Pools keep the ticks of their components in columns, the ticks of other components are kept here per type.
+        # A running system stamps its own run tick instead, kept per thread since the scheduler runs systems side by side
+        self.change_tick = 1
+        self.tick_counter = itertools.count(2)
+        self.tick_lock = threading.Lock()
+        self.running_ticks = threading.local()
+        self.component_ticks = {}
+
+        # Bumped whenever a LinkComponent of the scene changes its parent, so the LinkSystem knows when to rebuild the hierarchy
+        self.hierarchy_version = 0
+
+        # Structural changes requested while systems iterate are recorded and applied after them
+        self.command_buffer = CommandBuffer(self)
+        self.is_updating = False
+
+        # Runs the systems on a thread pool when set, otherwise they run one after the other
+        self.scheduler = None
+
+        # Runs systems that provide on_update_chunk in worker processes when set
+        self.process_executor = None
+        self.headless = False
+
+        self.empty_archetype = self.get_archetype(frozenset())
+
+    def allocate_entity(self):
+        entity = self.entity_allocator.allocate()
+
+        # Entity locations are indexed by the entity's index, recycled indices reuse their entry.
+        # The entry stays None until the entity is enrolled
+        if entity.index >= len(self.entity_locations):
+            self.entity_locations.extend([None] * (entity.index + 1 - len(self.entity_locations)))
+
+        return entity
+
+    def reserve_entity(self):
+        """
+        Hands out an entity handle without placing the entity in the scene yet, see CommandBuffer.spawn.
+        """
+        return self.allocate_entity()
+
+    def enroll_entity(self, entity: Entity = None):
+        if entity is None:
+            entity = self.allocate_entity()
+
+        self.entities[entity.id] = entity
+
+        # Every entity starts its life in the archetype without components
+        row = self.empty_archetype.append(entity, {})
+        self.entity_locations[entity.index] = (self.empty_archetype, row)
+
         return entity
 
+    def destroy_entity(self, entity: Entity):
+        if self.is_updating:
+            self.command_buffer.destroy(entity)
+            return
+
+        if not self.is_alive(entity):
+            return
+
+        archetype, row = self.entity_locations[entity.index]
+
+        # Update existing queries that contain this entity
+        for query in self.queries.values():
+            query.remove(entity)
+
+        # Fill the entity's row with the last one of its archetype
+        components, moved_entity = archetype.swap_remove(row)
+        if moved_entity is not None:
+            self.entity_locations[moved_entity.index] = (archetype, row)
+
+        for component in components.values():
+            self.release_component(entity, component)
+
+        for sparse_set in self.sparse_sets.values():
+            self.release_component(entity, sparse_set.remove(entity))
+
+        self.entity_locations[entity.index] = None
+        self.entities.pop(entity.id)
+
+        # Recycle the entity's index, every handle to it is stale from now on
+        self.entity_allocator.release(entity)
+
+    def is_alive(self, entity: Entity):
+        return self.entity_allocator.is_alive(entity)
+
     def get_entities(self):
-        return self.entities
-    
+        return list(self.entities.values())
+
+    def get_archetype(self, component_types: frozenset):
+        archetype = self.archetypes.get(component_types)
+
+        # Create new archetype if it does not exist yet
+        if archetype is None:
+            archetype = Archetype(component_types)
+            self.archetypes[component_types] = archetype
+
+        return archetype
+
+    def get_archetypes(self):
+        return self.archetypes.values()
+
+    def set_component_storage(self, component_type: type, storage: StorageType):
+        """
+        Selects where components of the given type are kept. Must be called before any of them is added.
+        Archetype storage (the default) suits components that are iterated together,
+        sparse set storage suits tag-like or frequently toggled components since adding and removing them never moves other component data.
+        """
+        if self.get_component_storage(component_type) is storage:
+            return
+
+        in_use = component_type in self.sparse_sets or any(component_type in archetype.component_types for archetype in self.get_archetypes())
+        if in_use:
+            raise RuntimeError(f'Storage of {component_type.__name__} can not change after components of it were added!')
+
+        if storage is StorageType.SPARSE_SET:
+            self.sparse_sets[component_type] = SparseSet()
+        else:
+            self.sparse_sets.pop(component_type)
+
+    def get_component_storage(self, component_type: type):
+        return StorageType.SPARSE_SET if component_type in self.sparse_sets else StorageType.ARCHETYPE
+
+    def is_sparse_component(self, component_type: type):
+        return component_type in self.sparse_sets
+
+    def get_component_pool(self, component_type: type):
+        pool = self.component_pools.get(component_type)
+
+        # Create new component pool if it does not exist yet, once even when systems on several threads ask for it
+        if pool is None:
+            with self.pool_lock:
+                pool = self.component_pools.get(component_type)
+
+                if pool is None:
+                    pool = ComponentPool(component_type.dtype, bookkeeping_fields=component_type.bookkeeping_fields)
+                    pool.clock = self
+                    self.component_pools[component_type] = pool
+
+        return pool
+
     def add_component(self, entity: Entity, component):
-        # Create new component reference array for entity if it does not exist
-        if entity.id not in self.entity_components:
-            self.entity_components[entity.id] = {}
+        """
+        Adds the component to the entity. While systems are updating the addition is deferred to the end of the frame.
+        """
+        if self.is_updating:
+            return self.command_buffer.add_component(entity, component)
+
+        if self.get_location(entity) is None:
+            raise RuntimeError(f'{entity} is not an entity of the scene!')
 
         # Retrieve type from component
         component_type = type(component)
 
-        # Create new component array if it does not exist yet
-        if component_type not in self.component_arrays:
-            self.component_arrays[component_type] = []
+        existing_component = self.get_component(entity, component_type)
+        if existing_component is component:
+            return component
 
-        # Find the entities component reference
-        component_array = self.component_arrays[component_type]
-        component_index = len(component_array)
+        # Move the data of plain data components into their pool
+        if isinstance(component, PooledComponent):
+            self.get_component_pool(component_type).adopt(component)
 
-        # Update entity's component reference  
-        self.entity_components[entity.id][component_type] = component_index
+        sparse_set = self.sparse_sets.get(component_type)
 
-        # Add the new component to the appropriate component array
-        component_array.append(component)
+        # Replace the component in place if the entity already has one of this type
+        if existing_component is not None:
+            self.release_component(entity, existing_component)
+            self.mark_added(entity, component)
 
-        # Update existing systems that operate on this component. (Usefull in runtime addition of components)
-        for system in self.systems:
-            entity_components = self.get_entity_component_references(entity)
-            system.filter_entity_components(entity, entity_components, self.component_arrays)
+            if sparse_set is not None:
+                sparse_set.add(entity, component)
+            else:
+                archetype, row = self.entity_locations[entity.index]
+                archetype.set(row, component)
+
+            self.update_queries(entity, component_type)
+
+            return component
+
+        if sparse_set is not None:
+            # Sparse set components are not part of the entity's archetype, so nothing else moves
+            sparse_set.add(entity, component)
+        else:
+            archetype, _ = self.entity_locations[entity.index]
+
+            # Find the archetype that also contains the new component type
+            target_archetype = archetype.add_edges.get(component_type)
+            if target_archetype is None:
+                target_archetype = self.get_archetype(archetype.component_types | {component_type})
+                archetype.add_edges[component_type] = target_archetype
+
+            # Move the entity's row to the new archetype along with the new component
+            self.move_entity(entity, target_archetype, {component_type: component})
+
+        self.mark_added(entity, component)
+
+        # Update existing queries that depend on this component. (Usefull in runtime addition of components)
+        self.update_queries(entity, component_type)
 
         return component
-    
+
+    def add_components(self, entity: Entity, *components):
+        """
+        Adds several components at once, moving the entity to its final archetype in a single step.
+        """
+        if self.is_updating:
+            for component in components:
+                self.command_buffer.add_component(entity, component)
+            return
+
+        location = self.get_location(entity)
+        if location is None:
+            raise RuntimeError(f'{entity} is not an entity of the scene!')
+
+        archetype, _ = location
+        new_components = {}
+
+        for component in components:
+            component_type = type(component)
+
+            # Replacements and sparse set components do not move the entity
+            if component_type in archetype.component_types or component_type in self.sparse_sets:
+                self.add_component(entity, component)
+            else:
+                new_components[component_type] = component
+
+        if not new_components:
+            return
+
+        for component in new_components.values():
+            if isinstance(component, PooledComponent):
+                self.get_component_pool(type(component)).adopt(component)
+
+            self.mark_added(entity, component)
+
+        self.move_entity(entity, self.get_archetype(archetype.component_types.union(new_components)), new_components)
+
+        # Update every query that depends on one of the new components once
+        queries = {}
+        for component_type in new_components:
+            for query in self.queries_by_type.get(component_type, ()):
+                queries[id(query)] = query
+
+        for query in queries.values():
+            query.update(self, entity)
+
     def remove_component(self, entity: Entity, component_type: type):
+        if self.is_updating:
+            self.command_buffer.remove_component(entity, component_type)
+            return
+
         if self.has_component(entity, component_type) is False:
             return
-        
-        is_component_maniplulated_by_system = False
-        unregister_component = False
 
-        # Update existing systems that operate on this component. (Usefull in runtime deletion of components)
-        for system in self.systems:
-            is_component_maniplulated_by_system = system.remove_entity_components(entity, component_type)
+        if component_type in self.sparse_sets:
+            self.release_component(entity, self.sparse_sets[component_type].remove(entity))
+
+            # Update existing queries that depend on this component. (Usefull in runtime deletion of components)
+            self.update_queries(entity, component_type)
+            return
+
+        archetype, row = self.entity_locations[entity.index]
+        component = archetype.get(row, component_type)
+
+        # Find the archetype that lacks the removed component type
+        target_archetype = archetype.remove_edges.get(component_type)
+        if target_archetype is None:
+            target_archetype = self.get_archetype(archetype.component_types - {component_type})
+            archetype.remove_edges[component_type] = target_archetype
+
+        # Move the entity's row to the new archetype, the removed component is dropped
+        self.move_entity(entity, target_archetype)
+        self.release_component(entity, component)
+
+        # Update existing queries that depend on this component. (Usefull in runtime deletion of components)
+        self.update_queries(entity, component_type)
+
+    def query(self, *component_types, exclude = ()):
+        """
+        Returns the cached query over the entities that have all of the given component types and none of the excluded ones.
+        """
+        key = (component_types, frozenset(exclude))
+        query = self.queries.get(key)
+
+        # Create and fill new query if it does not exist yet
+        if query is None:
+            query = Query(component_types, frozenset(exclude))
+            query.populate(self)
+            self.queries[key] = query
+
+            for component_type in set(component_types) | query.exclude:
+                self.queries_by_type.setdefault(component_type, []).append(query)
+
+        return query
+
+    def update_queries(self, entity: Entity, component_type: type):
+        for query in self.queries_by_type.get(component_type, ()):
+            query.update(self, entity)
+
+    def release_component(self, entity: Entity, component):
+        if isinstance(component, PooledComponent):
+            self.component_pools[type(component)].release(component)
+        elif component is not None:
+            self.component_ticks[type(component)].pop(entity.id, None)
+
+    def increment_change_tick(self):
+        # Under the lock, so the tick only ever goes up no matter which of the scheduler's threads advances it
+        with self.tick_lock:
+            self.change_tick = next(self.tick_counter)
+            return self.change_tick
+
+    def begin_system_run(self):
+        """
+        Returns a new tick for a system about to run, stamped on everything changed from its thread until end_system_run.
+        """
+        self.running_ticks.tick = self.increment_change_tick()
+        return self.running_ticks.tick
+
+    def end_system_run(self):
+        self.running_ticks.tick = None
+
+        # Changes made after the run are stamped with a later tick
+        self.increment_change_tick()
+
+    def get_change_tick(self):
+        """
+        The tick to stamp changes with: the run tick of the system running on this thread, otherwise the current tick.
+        """
+        tick = getattr(self.running_ticks, 'tick', None)
+        return self.change_tick if tick is None else tick
 
-            if is_component_maniplulated_by_system:
-                unregister_component = True
+    def mark_added(self, entity: Entity, component):
+        # Pooled components get stamped by their pool when adopted
+        if not isinstance(component, PooledComponent):
+            tick = self.get_change_tick()
+            self.component_ticks.setdefault(type(component), {})[entity.id] = [tick, tick]
 
-        # Update component arrays and entity components references
-        if unregister_component:
-            self.component_arrays[component_type].pop(self.entity_components[entity.id][component_type])
-            self.entity_components[entity.id].pop(component_type)
+    def mark_changed(self, entity: Entity, component_type: type):
+        """
+        Stamps the entity's component as changed, for edits that do not assign a field of a pooled component.
+        """
+        component = self.get_component(entity, component_type)
+        if component is None:
+            return
+
+        if isinstance(component, PooledComponent):
+            component._pool.mark_changed(component._slot)
+        else:
+            self.component_ticks[component_type][entity.id][1] = self.get_change_tick()
+
+    def get_component_ticks(self, entity: Entity, component_type: type):
+        """
+        Returns the change ticks at which the entity's component was added and last changed.
+        """
+        component = self.get_component(entity, component_type)
+        if component is None:
+            return None
+
+        if isinstance(component, PooledComponent):
+            return int(component._pool.columns['added_tick'][component._slot]), int(component._pool.columns['changed_tick'][component._slot])
+
+        return tuple(self.component_ticks[component_type][entity.id])
+
+    def move_entity(self, entity: Entity, target_archetype: Archetype, added_components: dict = None):
+        archetype, row = self.entity_locations[entity.index]
+
+        components, moved_entity = archetype.swap_remove(row)
+
+        # The last row of the old archetype now lives in the freed row
+        if moved_entity is not None:
+            self.entity_locations[moved_entity.index] = (archetype, row)
+
+        if added_components is not None:
+            components.update(added_components)
+
+        new_row = target_archetype.append(entity, components)
+        self.entity_locations[entity.index] = (target_archetype, new_row)
+
+    def get_location(self, entity: Entity):
+        """
+        Returns the archetype and row of the entity, None for an entity reserved but not enrolled yet
+        and for stale handles, whose index may already belong to another entity.
+        """
+        if not self.entity_allocator.is_alive(entity):
+            return None
+
+        return self.entity_locations[entity.index]
 
     def has_component(self, entity: Entity, component_type: type):
-        return component_type in self.entity_components.get(entity.id)
-    
+        location = self.get_location(entity)
+        if location is None:
+            return False
+
+        sparse_set = self.sparse_sets.get(component_type)
+        if sparse_set is not None:
+            return entity in sparse_set
+
+        archetype, _ = location
+        return component_type in archetype.component_types
+
+    def has_components(self, entity: Entity, component_types):
+        location = self.get_location(entity)
+        if location is None:
+            return False
+
+        archetype, _ = location
+
+        for component_type in component_types:
+            sparse_set = self.sparse_sets.get(component_type)
+
+            if sparse_set is None:
+                if component_type not in archetype.component_types:
+                    return False
+            elif entity not in sparse_set:
+                return False
+
+        return True
+
     def get_component(self, entity: Entity, component_type: type):
-        if component_type in self.entity_components[entity.id]:
-            component_index = self.entity_components[entity.id][component_type]
-            return self.component_arrays[component_type][component_index]
+        location = self.get_location(entity)
+        if location is None:
+            return None
+
+        sparse_set = self.sparse_sets.get(component_type)
+        if sparse_set is not None:
+            return sparse_set.get(entity)
+
+        archetype, row = location
+
+        if component_type in archetype.component_types:
+            return archetype.get(row, component_type)
         else:
             return None
-    
-    def get_entity_component_references(self, entity: Entity):
-        return self.entity_components.get(entity.id, {})
-    
-    def get_components_array(self):
-        return self.component_arrays
-    
+
+    def get_components(self, entity: Entity, component_types):
+        location = self.get_location(entity)
+        if location is None:
+            return None
+
+        archetype, row = location
+
+        return tuple(
+            self.sparse_sets[component_type].get(entity) if component_type in self.sparse_sets else archetype.get(row, component_type)
+            for component_type in component_types
+        )
+
     def register_system(self, system):
         self.systems.append(system)
 
+        system.scene = self
         system.filter(self)
 
         from ECS.Application import Application
 
-        if (Application().is_running()):
+        self.headless = Application().is_headless()
+
+        if (Application().is_running() and self.should_run(system)):
             system.on_create_base()
 
     def get_systems(self):
         return self.systems
-    
+
     def get_system(self, system_type: type):
         for system in self.systems:
             if type(system) is system_type:
                 return system
-    
+
     def on_create(self):
         from ECS.Application import Application
 
         Application().set_is_running(True)
-        
-        for system in self.systems:
-            system.on_create_base()
+        self.headless = Application().is_headless()
+
+        self.is_updating = True
+
+        # A system raising must not leave every later structural change deferred to a buffer that is never played back
+        try:
+            for system in self.systems:
+                if self.should_run(system):
+                    system.on_create_base()
+        finally:
+            self.is_updating = False
+
+        self.command_buffer.playback()
+
+    def should_run(self, system):
+        # Systems that need a graphics context are skipped when the application runs headless
+        return not (system.requires_graphics and self.headless)
 
     def on_update(self, ts):
-        for system in self.systems:
-            system.on_update_base(ts)
\ No newline at end of file
+        self.update_systems([system for system in self.systems if system.update_phase is UpdatePhase.VARIABLE and self.should_run(system)], ts)
+
+    def on_fixed_update(self, ts):
+        self.update_systems([system for system in self.systems if system.update_phase is UpdatePhase.FIXED and self.should_run(system)], ts)
+
+    def update_systems(self, systems, ts):
+        if not systems:
+            return
+
+        self.is_updating = True
+
+        try:
+            if self.scheduler is not None:
+                self.scheduler.run(systems, ts)
+            else:
+                for system in systems:
+                    system.on_update_base(ts)
+        finally:
+            self.is_updating = False
+
+        # Sync point, apply the structural changes recorded during the update in one sweep
+        self.command_buffer.playback()
+
+    def set_scheduler(self, scheduler):
+        self.scheduler = scheduler
+
+    def get_scheduler(self):
+        return self.scheduler
+
+    def set_process_executor(self, process_executor):
+        self.process_executor = process_executor
+
+    def get_process_executor(self):
+        return self.process_executor
+
+    def get_command_buffer(self):
+        return self.command_buffer
+
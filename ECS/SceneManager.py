@@ -1,4 +1,5 @@
 from ECS.Scene import Scene
+from ECS.Profiler import Profiler
 
 class SceneManager(object):
     def __new__(cls):
@@ -24,6 +25,10 @@ class SceneManager(object):
         cls.instance.active_scene = cls.instance.scenes[cls.instance.active_scene_index]
         cls.instance.active_scene.on_create()
 
+    def on_fixed_update(cls, ts):
+        # TODO: null check
+        cls.instance.active_scene.on_fixed_update(ts)
+
     def on_update(cls, ts):
         # TODO: null check
         cls.instance.active_scene.on_update(ts)
@@ -40,6 +45,10 @@ class SceneManager(object):
         cls.instance.scene_change_requested = True
 
     def change_scene_deffered(cls):
+        with Profiler().scope('SceneManager.change_scene', 'scene'):
+            cls.instance.load_requested_scene()
+
+    def load_requested_scene(cls):
         if cls.instance.new_scene_to_loaded is None:
             if len(cls.instance.scenes) <= cls.instance.active_scene_index:
                 print('Out of bounds scenes')
@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+class Scheduler:
+    """
+    Runs the systems of a scene on a thread pool.
+    Every system depends on the earlier registered systems it conflicts with, two systems conflict when one writes
+    a component type the other reads or writes. Systems that declare no access conflict with every other system.
+    Systems flagged main_thread run on the calling thread, the rest on the pool.
+    """
+
+    def __init__(self, workers: int = None):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.graphs = {}
+
+    def conflicts(self, first, second):
+        if first.reads is None and first.writes is None:
+            return True
+        if second.reads is None and second.writes is None:
+            return True
+
+        first_writes, second_writes = set(first.writes or []), set(second.writes or [])
+        first_reads, second_reads = set(first.reads or []), set(second.reads or [])
+
+        return bool(first_writes & (second_reads | second_writes)) or bool(second_writes & first_reads)
+
+    def build(self, systems):
+        """
+        Builds the dependency graph, as the list of earlier systems each system has to wait for.
+        """
+        return [[previous for previous in range(index) if self.conflicts(systems[previous], system)] for index, system in enumerate(systems)]
+
+    def run(self, systems, ts):
+        # Build a graph only for system lists that were not seen before
+        key = tuple(id(system) for system in systems)
+        dependencies = self.graphs.get(key)
+
+        if dependencies is None:
+            dependencies = self.build(systems)
+            self.graphs[key] = dependencies
+
+        done = set()
+        pending = set(range(len(systems)))
+        running = {}
+
+        while pending or running:
+            ready = [index for index in sorted(pending) if all(dependency in done for dependency in dependencies[index])]
+
+            for index in ready:
+                pending.discard(index)
+
+                if systems[index].main_thread:
+                    systems[index].on_update_base(ts)
+                    done.add(index)
+                else:
+                    running[self.executor.submit(systems[index].on_update_base, ts)] = index
+
+            # Main thread systems might have unblocked others, look again before waiting
+            if any(index in done for index in ready):
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                # Surface exceptions raised inside the worker threads
+                future.result()
+                done.add(running.pop(future))
+
+    def shutdown(self):
+        self.executor.shutdown()
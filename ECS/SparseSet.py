@@ -0,0 +1,67 @@
+from ECS.Entity import Entity
+
+class SparseSet:
+    """
+    Storage for a single component type: a dense array of components plus a sparse array
+    that maps entity indices to positions in the dense one.
+    Adding and removing are O(1) and never move the data of other component types.
+    """
+
+    def __init__(self):
+        self.sparse = []
+        self.dense = []
+        self.entities = []
+
+    def __len__(self):
+        return len(self.dense)
+
+    def __contains__(self, entity: Entity):
+        index = entity.index
+
+        if index >= len(self.sparse):
+            return False
+
+        dense_index = self.sparse[index]
+        return dense_index is not None and self.entities[dense_index].id == entity.id
+
+    def get(self, entity: Entity):
+        if entity not in self:
+            return None
+
+        return self.dense[self.sparse[entity.index]]
+
+    def add(self, entity: Entity, component):
+        index = entity.index
+
+        # Replace the component in place if the entity already has one
+        if entity in self:
+            self.dense[self.sparse[index]] = component
+            return
+
+        if index >= len(self.sparse):
+            self.sparse.extend([None] * (index + 1 - len(self.sparse)))
+
+        self.sparse[index] = len(self.dense)
+        self.dense.append(component)
+        self.entities.append(entity)
+
+    def remove(self, entity: Entity):
+        if entity not in self:
+            return None
+
+        dense_index = self.sparse[entity.index]
+        component = self.dense[dense_index]
+
+        # Move the last component into the freed position
+        last = len(self.dense) - 1
+        if dense_index != last:
+            moved_entity = self.entities[last]
+            self.dense[dense_index] = self.dense[last]
+            self.entities[dense_index] = moved_entity
+            self.sparse[moved_entity.index] = dense_index
+
+        self.dense.pop()
+        self.entities.pop()
+        self.sparse[entity.index] = None
+
+        return component
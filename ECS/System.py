@@ -1,3 +1,6 @@
+from ECS.ComponentPool import ColumnView
+from ECS.Profiler import Profiler
+
 from enum import Enum
 
 class SystemState(Enum):
@@ -5,11 +8,41 @@ class SystemState(Enum):
     PLAY = 1
     PAUSE = 2
 
+class UpdatePhase(Enum):
+    VARIABLE = 0
+    FIXED = 1
+
 class System:
-    def __init__(self, filters: list[type]):
+    # Component types the system reads and writes, used by the Scheduler to run non-conflicting systems in parallel.
+    # A system that declares neither runs alone.
+    reads: list[type] = None
+    writes: list[type] = None
+
+    # Systems that must run on the thread owning the graphics context
+    main_thread = False
+
+    # Systems that issue graphics calls, skipped when the application runs headless
+    requires_graphics = False
+
+    # Variable systems update once per frame, fixed systems once per simulation tick
+    update_phase = UpdatePhase.VARIABLE
+
+    def __init__(self, filters: list[type], batched = True, exclude: list[type] = None, reads: list[type] = None, writes: list[type] = None, change_filters: list = None):
         self.filters = filters
-        self.filtered_components = []
-        self.filtered_entities = []
+        self.exclude = exclude if exclude is not None else []
+
+        # Filters like changed(TransformComponent) or added(RenderComponent), see ECS.Query
+        self.change_filters = change_filters if change_filters is not None else []
+        self.last_run_tick = 0
+
+        if reads is not None:
+            self.reads = reads
+        if writes is not None:
+            self.writes = writes
+
+        self.query = None
+        self.scene = None
+        self.batched = batched
         self.state = SystemState.PLAY        
 
     def set_state(self, state: SystemState):
@@ -17,64 +50,136 @@ class System:
 
     def get_state(self):
         return self.state
+
+    def set_update_phase(self, update_phase: UpdatePhase):
+        self.update_phase = update_phase
+
+    def get_update_phase(self):
+        return self.update_phase
     
+    @property
+    def filtered_entities(self):
+        return self.query.entities if self.query is not None else []
+
+    @property
+    def filtered_components(self):
+        return self.query.components if self.query is not None else []
+
+    @property
+    def commands(self):
+        """
+        The scene's command buffer, structural changes recorded in it are applied after all systems have updated.
+        """
+        return self.scene.get_command_buffer()
+
     def filter(self, scene):
-        components_array = scene.get_components_array()
+        # Systems with the same filters share the scene's cached query
+        self.query = scene.query(*self.filters, exclude=self.exclude)
 
-        for entity in scene.get_entities():
-            entity_components = scene.get_entity_component_references(entity)
-            self.filter_entity_components(entity, entity_components, components_array)
+    def has_entity(self, entity):
+        return self.query is not None and self.query.has_entity(entity)
 
-    def filter_entity_components(self, entity, entity_components, components_array):
-        if (entity in self.filtered_entities):
-            return
-        
-        i, j = 0, 0
-        for filter in self.filters:
-            j += 1
-            if filter in entity_components.keys():
-                i += 1            
-        if (j == i):
-            self.filtered_components.append(tuple(components_array[filter][entity_components[filter]] for filter in self.filters))
-            self.filtered_entities.append(entity)
-
-    def remove_entity_components(self, entity, component):
-        if entity not in self.filtered_entities:
-            return False
-
-        index = self.filtered_entities.index(entity)
-        
-        if not tuple(filter(lambda i: (type(i) == component), self.filtered_components[index])):
-            return False
-
-        self.filtered_entities.remove(entity)
-        self.filtered_components.pop(index)
-
-        return True
+    def get_columns(self):
+        return self.query.get_columns(self.scene)
+
+    def flush_columns(self, columns):
+        for column in columns:
+            if isinstance(column, ColumnView):
+                column.flush()
+
+    def get_changed_rows(self):
+        """
+        Returns the rows of the entities that pass the change filters since the system last ran.
+        """
+        return self.query.get_changed_rows(self.scene, self.change_filters, self.last_run_tick)
+
+    def get_filtered_rows(self):
+        """
+        Returns the filtered entities and their columns, for the batch hooks,
+        narrowed down to the entities that pass the change filters since the system last ran when it has any.
+        """
+        entities, columns = self.filtered_entities, self.get_columns()
+
+        if not self.change_filters:
+            return entities, columns
+
+        rows = self.get_changed_rows()
+
+        return (
+            [entities[row] for row in rows],
+            [column.select(rows) if isinstance(column, ColumnView) else [column[row] for row in rows] for column in columns]
+        )
+
+    def get_filtered_components(self):
+        """
+        Returns the filtered entities and their components, for the per entity hooks, narrowed down the same way without building columns.
+        """
+        entities, components = self.filtered_entities, self.filtered_components
+
+        if not self.change_filters:
+            return entities, components
+
+        rows = self.get_changed_rows()
+
+        return [entities[row] for row in rows], [components[row] for row in rows]
 
     def on_create_base(self):
-        # Check if the subclass has overridden the method
-        if hasattr(self, 'on_create') and callable(getattr(self, 'on_create')):
-            if self.state is SystemState.PLAY:
+        if self.state is not SystemState.PLAY:
+            return
+
+        with Profiler().scope(f'{type(self).__name__}.on_create', 'system'):
+            run_tick = self.scene.begin_system_run()
+
+            # Prefer the batch hook, called once with whole columns
+            if self.batched and hasattr(self, 'on_create_batch') and callable(getattr(self, 'on_create_batch')):
+                columns = self.get_columns()
+                self.on_create_batch(self.filtered_entities, *columns)
+                self.flush_columns(columns)
+            # Check if the subclass has overridden the method
+            elif hasattr(self, 'on_create') and callable(getattr(self, 'on_create')):
                 for entity, components in zip(self.filtered_entities, self.filtered_components):
                     if (len(components) == 1):
                         self.on_create(entity, components[0])
                     else:
                         self.on_create(entity, components)
-        else:
-            print("on_update method not implemented")
+            else:
+                print("on_update method not implemented")
+
+            self.complete_run(run_tick)
 
     def on_update_base(self, ts):
-        # Check if the subclass has overridden the method
-        if hasattr(self, 'on_update') and callable(getattr(self, 'on_update')):
-            if self.state is SystemState.PLAY:
-                for entity, components in zip(self.filtered_entities, self.filtered_components):
+        if self.state is not SystemState.PLAY:
+            return
+
+        with Profiler().scope(f'{type(self).__name__}.on_update', 'system'):
+            run_tick = self.scene.begin_system_run()
+
+            # Split the update in chunks over worker processes when the scene has a process executor
+            if self.scene.process_executor is not None and hasattr(self, 'on_update_chunk') and callable(getattr(self, 'on_update_chunk')):
+                self.scene.process_executor.run(self, ts)
+            # Prefer the batch hook, called once per frame with whole columns
+            elif self.batched and hasattr(self, 'on_update_batch') and callable(getattr(self, 'on_update_batch')):
+                entities, columns = self.get_filtered_rows()
+                self.on_update_batch(ts, entities, *columns)
+                self.flush_columns(columns)
+            # Check if the subclass has overridden the method
+            elif hasattr(self, 'on_update') and callable(getattr(self, 'on_update')):
+                entities, components = self.get_filtered_components()
+                for entity, components in zip(entities, components):
                     if (len(components) == 1):
                         self.on_update(ts, entity, components[0])
                     else:
                         self.on_update(ts, entity, components)
-        else:
-            print("on_update method not implemented")
+            else:
+                print("on_update method not implemented")
+
+            self.complete_run(run_tick)
+
+    def complete_run(self, run_tick: int):
+        # Changes the system made itself carry its run tick and are not reported back to it,
+        # systems running alongside it on other threads stamp their own run ticks
+        self.last_run_tick = run_tick
+        self.scene.end_system_run()
 
     def filtered_data(self):
         return zip(self.filtered_entities, self.filtered_components)
\ No newline at end of file
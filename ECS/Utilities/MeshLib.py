@@ -0,0 +1,80 @@
+from ECS.Renderer.RenderCommand import RenderCommand, BufferType
+
+import numpy as np
+
+import hashlib
+
+class Mesh:
+    """
+    Vertex attributes and indices uploaded once to static GPU buffers, shared by every entity with the same geometry.
+    """
+
+    def __init__(self, attributes: list, indices):
+        self.attribute_sizes = tuple(len(attribute[0]) for attribute in attributes)
+        self.vertex_count = len(attributes[0])
+
+        # Meshes without indices are drawn as a plain triangle list
+        self.indices = np.arange(self.vertex_count, dtype=np.uint32) if indices is None else np.asarray(indices, dtype=np.uint32).reshape(-1)
+        self.index_count = len(self.indices)
+
+        self.vbos = []
+        for attribute in attributes:
+            self.vbos.append(RenderCommand.create_buffer(BufferType.VERTEX, attribute.size * 4, np.ascontiguousarray(attribute, dtype=np.float32), dynamic = False))
+
+        self.ebo = RenderCommand.create_buffer(BufferType.INDEX, self.index_count * 4, self.indices, dynamic = False)
+
+    def clean(self):
+        RenderCommand.delete_buffers(self.vbos + [self.ebo])
+
+class MeshLib(object):
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.instance = super(MeshLib, cls).__new__(cls)
+            cls.instance.meshes = {}
+            cls.instance.keys_by_identity = {}
+        return cls.instance
+
+    def get_key(cls, attributes: list, indices):
+        """
+        Hashes the attribute and index data, equal geometry gets the same key even when stored in different arrays.
+        Entities usually share the very same arrays, those are only hashed the first time they are seen.
+        """
+        arrays = tuple(attributes) + (indices,)
+        identity = tuple(id(array) for array in arrays)
+
+        # The arrays are kept along with the key, so their ids cannot be reused by other arrays
+        cached = cls.instance.keys_by_identity.get(identity)
+        if cached is not None:
+            return cached[1]
+
+        digest = hashlib.blake2b(digest_size=16)
+
+        for array in list(attributes) + ([indices] if indices is not None else []):
+            array = np.ascontiguousarray(array)
+            digest.update(f'{array.dtype.str}{array.shape}'.encode())
+            digest.update(array.tobytes())
+
+        key = digest.hexdigest()
+        cls.instance.keys_by_identity[identity] = (arrays, key)
+
+        return key
+
+    def build(cls, attributes: list, indices):
+        """
+        Returns the mesh of the given geometry, uploading it only the first time it is seen.
+        """
+        key = cls.instance.get_key(attributes, indices)
+
+        mesh = cls.instance.meshes.get(key)
+        if mesh is None:
+            mesh = Mesh(attributes, indices)
+            cls.instance.meshes[key] = mesh
+
+        return mesh
+
+    def clean(cls):
+        for mesh in cls.instance.meshes.values():
+            mesh.clean()
+
+        cls.instance.meshes = {}
+        cls.instance.keys_by_identity = {}
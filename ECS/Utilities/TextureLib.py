@@ -1,4 +1,5 @@
-import OpenGL.GL as gl
+from ECS.Renderer.RenderCommand import RenderCommand
+
 from PIL import Image
 
 class TextureLib(object):
@@ -22,28 +23,12 @@ class TextureLib(object):
             img = img.transpose(Image.FLIP_TOP_BOTTOM)
             img_bytes = img.convert("RGBA").tobytes("raw", "RGBA", 0, -1)
 
-        texture_id = gl.glGenTextures(1)        
-        gl.glBindTexture(gl.GL_TEXTURE_2D, texture_id)
-
-        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_S, gl.GL_REPEAT)
-        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_T, gl.GL_REPEAT)
-        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_LINEAR)
-        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_LINEAR)
-
-        gl.glTexImage2D(
-            gl.GL_TEXTURE_2D,                               #Target
-            0,                                              # Level
-            gl.GL_RGBA8,                                    # Internal Format
+        texture_id = RenderCommand.create_texture(
             img.width if img is not None else img_data[1],  # Width
             img.height if img is not None else img_data[2], # Height
-            0,                                              # Border
-            gl.GL_RGBA,                                     # Format
-            gl.GL_UNSIGNED_BYTE,                            # Type
             img_bytes                                       # Data
         )
 
-        gl.glGenerateMipmap(gl.GL_TEXTURE_2D)
-
         cls.instance.textures[name] = texture_id
         cls.instance.slots[name] = cls.instance.current_slot
 
@@ -58,15 +43,15 @@ class TextureLib(object):
         return cls.instance.slots.get(name)
     
     def bind(cls, name):
-        gl.glBindTextureUnit(cls.instance.get_slot(name), cls.instance.get_id(name))
+        RenderCommand.bind_texture(cls.instance.get_slot(name), cls.instance.get_id(name))
 
     def unbind(cls, name):
-        gl.glBindTextureUnit(cls.instance.get_slot(name), 0)
+        RenderCommand.bind_texture(cls.instance.get_slot(name), 0)
 
     def bind_textures(cls):
         for slot, id in zip(cls.instance.slots.values(), cls.instance.textures.values()):
-            gl.glBindTextureUnit(slot, id)
+            RenderCommand.bind_texture(slot, id)
 
     def unbind_textures(cls):
         for slot in cls.instance.slots.values():
-            gl.glBindTextureUnit(slot, 0)
\ No newline at end of file
+            RenderCommand.bind_texture(slot, 0)
\ No newline at end of file
@@ -0,0 +1,199 @@
+from ECS.BuiltInComponents import TransformComponent, LinkComponent, InfoComponent, RenderComponent, MaterialComponent
+from ECS.BuiltInSystems import TransformSystem, RenderingSystem
+from ECS.Utilities.MaterialLib import MaterialLib, MaterialData
+from ECS.Utilities.ShaderLib import ShaderLib
+from ECS.Utilities.TextureLib import TextureLib
+from ECS.ComponentPool import PooledComponent
+from ECS.System import System
+from ECS.Scene import Scene
+
+import numpy as np
+
+"""
+Synthetic scenes for the benchmarks
+"""
+
+class VelocityComponent(PooledComponent):
+    __slots__ = ()
+
+    schema = [
+        ('linear', np.float32, (3,)),
+    ]
+
+    def __init__(self, linear):
+        self.linear = linear
+
+class HealthComponent:
+    def __init__(self, health = 100.0):
+        self.health = health
+
+class TagComponent:
+    pass
+
+# Optional component types, entity i gets the ones picked by the bits of i % 2^len
+OPTIONAL_COMPONENTS = [
+    lambda rng: VelocityComponent(rng.standard_normal(3).astype(np.float32)),
+    lambda rng: HealthComponent(),
+    lambda rng: TagComponent(),
+    lambda rng: InfoComponent(),
+]
+
+class MovementSystem(System):
+    """
+    Moves every entity along its velocity, either in one batch or entity by entity.
+    """
+
+    reads = [VelocityComponent, TransformComponent]
+    writes = [TransformComponent]
+
+    def on_create(self, entity, components):
+        pass
+
+    def on_update_batch(self, ts, entities, transforms, velocities):
+        transforms.translation = transforms.translation + velocities.linear * ts
+
+    def on_update(self, ts, entity, components):
+        transform, velocity = components
+        transform.translation = transform.translation + velocity.linear * ts
+
+def create_transform(rng):
+    return TransformComponent(
+        rng.standard_normal(3).astype(np.float32),
+        rng.uniform(0.0, 360.0, 3).astype(np.float32),
+        np.ones(3, dtype=np.float32)
+    )
+
+def create_components(index: int, archetype_count: int, rng):
+    # Spread the entities over archetype_count different component combinations
+    archetype = index % archetype_count
+
+    components = [create_transform(rng)]
+    for bit, create_component in enumerate(OPTIONAL_COMPONENTS):
+        if archetype & (1 << bit):
+            components.append(create_component(rng))
+
+    return components
+
+def populate_scene(scene: Scene, entity_count: int, archetype_count: int = 8, seed: int = 0):
+    """
+    Adds entity_count entities with a transform each, spread over archetype_count archetypes, returns the entities.
+    """
+    rng = np.random.default_rng(seed)
+    entities = []
+
+    for index in range(entity_count):
+        entity = scene.enroll_entity()
+
+        for component in create_components(index, archetype_count, rng):
+            scene.add_component(entity, component)
+
+        entities.append(entity)
+
+    return entities
+
+def generate_scene(entity_count: int, archetype_count: int = 8, seed: int = 0):
+    scene = Scene()
+    entities = populate_scene(scene, entity_count, archetype_count, seed)
+
+    return scene, entities
+
+def generate_hierarchy(entity_count: int, depth: int, seed: int = 0):
+    """
+    Builds a scene of linked transforms exactly depth levels deep, with the entities spread evenly over the levels.
+    Every entity of a level is linked to one of the entities of the level above.
+    """
+    rng = np.random.default_rng(seed)
+    scene = Scene()
+
+    level_size = max(1, entity_count // (depth + 1))
+    levels = []
+
+    for level in range(depth + 1):
+        count = level_size if level < depth else entity_count - level_size * depth
+        parents = levels[-1] if levels else None
+        entities = []
+
+        for index in range(count):
+            entity = scene.enroll_entity()
+            scene.add_component(entity, create_transform(rng))
+            scene.add_component(entity, LinkComponent(parents[index % len(parents)] if parents else None))
+            entities.append(entity)
+
+        levels.append(entities)
+
+    return scene, [entity for entities in levels for entity in entities]
+
+# Shaders of the render benchmark, the instanced one reads the model matrix per instance
+VERTEX_SHADER = """
+    #version 460 core
+    layout(location = 0) in vec3 a_Pos;
+    layout(location = 1) in vec2 a_TexCoord;
+    out vec2 v_TexCoord;
+    uniform mat4 model;
+    uniform mat4 view;
+    uniform mat4 projection;
+    void main()
+    {
+        v_TexCoord = a_TexCoord;
+        gl_Position = vec4(a_Pos, 1.0) * model * view * projection;
+    }
+"""
+
+INSTANCED_VERTEX_SHADER = """
+    #version 460 core
+    layout(location = 0) in vec3 a_Pos;
+    layout(location = 1) in vec2 a_TexCoord;
+    layout(location = 2) in mat4 a_Model;
+    out vec2 v_TexCoord;
+    uniform mat4 view;
+    uniform mat4 projection;
+    void main()
+    {
+        v_TexCoord = a_TexCoord;
+        gl_Position = vec4(a_Pos, 1.0) * a_Model * view * projection;
+    }
+"""
+
+FRAGMENT_SHADER = """
+    #version 460 core
+    in vec2 v_TexCoord;
+    out vec4 FragColor;
+    uniform sampler2D u_Textures[32];
+    uniform float u_TextureId;
+    uniform vec4 u_Color;
+    void main()
+    {
+        FragColor = texture(u_Textures[int(u_TextureId)], v_TexCoord) * u_Color;
+    }
+"""
+
+QUAD_VERTICES = np.array([[-0.5, -0.5, 0.0], [0.5, -0.5, 0.0], [0.5, 0.5, 0.0], [-0.5, 0.5, 0.0]], dtype=np.float32)
+QUAD_TEXTURE_COORDINATES = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]], dtype=np.float32)
+QUAD_INDICES = np.array([0, 1, 2, 2, 3, 0], dtype=np.uint32)
+
+def generate_render_scene(entity_count: int, material_count: int, instanced: bool, seed: int = 0):
+    """
+    Builds a scene of textured quads spread over material_count materials, along with its transform and rendering systems.
+    Needs an initialized renderer backend.
+    """
+    rng = np.random.default_rng(seed)
+    scene = Scene()
+    scene.register_system(TransformSystem([TransformComponent]))
+    scene.register_system(RenderingSystem([RenderComponent, MaterialComponent, TransformComponent]))
+
+    shader = 'benchmark_instanced' if instanced else 'benchmark'
+    ShaderLib().build(shader, INSTANCED_VERTEX_SHADER if instanced else VERTEX_SHADER, FRAGMENT_SHADER)
+
+    for index in range(material_count):
+        TextureLib().build(f'benchmark_{index}', img_data=(bytes(rng.integers(0, 256, 4, dtype=np.uint8)), 1, 1))
+        MaterialLib().build(f'{shader}_{index}', MaterialData(shader, [f'benchmark_{index}']))
+
+    entities = []
+    for index in range(entity_count):
+        entity = scene.enroll_entity()
+        scene.add_component(entity, create_transform(rng))
+        scene.add_component(entity, RenderComponent([QUAD_VERTICES, QUAD_TEXTURE_COORDINATES], QUAD_INDICES))
+        scene.add_component(entity, MaterialComponent(f'{shader}_{index % material_count}'))
+        entities.append(entity)
+
+    return scene, entities
@@ -0,0 +1,232 @@
+from ECS.BuiltInComponents import TransformComponent, LinkComponent
+from ECS.BuiltInSystems import TransformSystem, LinkSystem
+
+from benchmarks.SceneGenerator import VelocityComponent, HealthComponent, MovementSystem, generate_scene, generate_hierarchy, populate_scene, generate_render_scene
+from ECS.Renderer.RenderCommand import RenderCommand, RendererAPI
+from ECS.Renderer.Renderer2D import Renderer2D
+from ECS.Scene import Scene
+
+import numpy as np
+
+import argparse
+import platform
+import tracemalloc
+import json
+import time
+import sys
+
+"""
+Benchmark suite of the ECS core, runs without a window or graphics context.
+
+Usage, from the repository root:
+    python -m benchmarks.run_benchmarks --sizes 1000 10000 100000 --output results.json
+    python -m benchmarks.run_benchmarks --compare results.json
+"""
+
+def measure(run, setup = None, repeat: int = 3):
+    """
+    Times run(state) repeat times, each time on a fresh state from setup(), and returns the durations in seconds.
+    """
+    durations = []
+
+    for _ in range(repeat):
+        state = setup() if setup is not None else None
+
+        start = time.perf_counter()
+        run(state)
+        durations.append(time.perf_counter() - start)
+
+    return durations
+
+def benchmark_creation(entity_count: int, repeat: int):
+    return measure(lambda scene: populate_scene(scene, entity_count), Scene, repeat)
+
+def benchmark_add_remove(entity_count: int, repeat: int):
+    def run(state):
+        scene, entities = state
+
+        for entity in entities:
+            scene.add_component(entity, HealthComponent())
+        for entity in entities:
+            scene.remove_component(entity, HealthComponent)
+
+    # Archetype 1 only has a transform and a velocity, so every entity starts without health
+    return measure(run, lambda: generate_scene(entity_count, archetype_count=2), repeat)
+
+def benchmark_iteration(entity_count: int, repeat: int, batched: bool):
+    def setup():
+        scene, _ = generate_scene(entity_count)
+        system = MovementSystem([TransformComponent, VelocityComponent], batched=batched)
+        scene.register_system(system)
+        scene.on_create()
+        return scene
+
+    return measure(lambda scene: scene.on_update(1.0 / 60.0), setup, repeat)
+
+def benchmark_transform_update(entity_count: int, repeat: int, moving: bool):
+    def setup():
+        scene, entities = generate_scene(entity_count, archetype_count=1)
+        scene.register_system(TransformSystem([TransformComponent]))
+        scene.on_create()
+
+        # Every transform changes in place, or none does
+        if moving:
+            scene.get_component_pool(TransformComponent).column('translation')[:] += 1.0
+
+        return scene
+
+    return measure(lambda scene: scene.on_update(1.0 / 60.0), setup, repeat)
+
+def benchmark_link_update(entity_count: int, repeat: int, depth: int):
+    def setup():
+        scene, entities = generate_hierarchy(entity_count, depth)
+        scene.register_system(TransformSystem([TransformComponent]))
+        scene.register_system(LinkSystem([LinkComponent, TransformComponent]))
+        scene.on_create()
+
+        # Move the roots, so the whole hierarchy below them has to be recomputed
+        scene.get_component_pool(TransformComponent).column('translation')[:max(1, entity_count // (depth + 1))] += 1.0
+
+        return scene
+
+    return measure(lambda scene: scene.on_update(1.0 / 60.0), setup, repeat)
+
+def benchmark_render(entity_count: int, repeat: int, material_count: int, instanced: bool):
+    """
+    Times a frame of the renderer on the null backend, which counts the commands instead of drawing.
+    Returns the durations and the draw calls per frame.
+    """
+    def setup():
+        Renderer2D().clean()
+
+        scene, _ = generate_render_scene(entity_count, material_count, instanced)
+        scene.on_create()
+        return scene
+
+    def run(scene):
+        RenderCommand.RENDERER.clear()
+
+        Renderer2D().begin_frame()
+        scene.on_update(1.0 / 60.0)
+        Renderer2D().end_frame()
+
+    durations = measure(run, setup, repeat)
+
+    return durations, RenderCommand.RENDERER.get_draw_calls()
+
+def benchmark_memory(entity_count: int):
+    """
+    Returns the bytes allocated per entity while building a scene, components and storage included.
+    """
+    tracemalloc.start()
+    scene, entities = generate_scene(entity_count)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak / entity_count
+
+def run_benchmarks(sizes: list, repeat: int, depths: list, per_entity_limit: int, names: list = None, material_counts: list = (1, 16)):
+    results = []
+
+    def record(name: str, entity_count: int, durations: list, **parameters):
+        best = min(durations)
+        results.append({
+            'name': name,
+            'entities': entity_count,
+            'parameters': parameters,
+            'seconds': best,
+            'median_seconds': float(np.median(durations)),
+            'microseconds_per_entity': best * 1000000.0 / entity_count,
+        })
+        print(f'{name:<28} {entity_count:>9} entities {best * 1000.0:>10.2f} ms {best * 1000000.0 / entity_count:>8.3f} us/entity {parameters or ""}')
+
+    def selected(name: str):
+        return names is None or name in names
+
+    # Rendering is measured without a GPU, only the command counts are kept
+    if selected('render'):
+        Renderer2D().initialize(RendererAPI.NULL)
+        RenderCommand.RENDERER.record = False
+
+    for entity_count in sizes:
+        if selected('creation'):
+            record('creation', entity_count, benchmark_creation(entity_count, repeat))
+        if selected('add_remove'):
+            record('add_remove', entity_count, benchmark_add_remove(entity_count, repeat))
+        if selected('iteration_batched'):
+            record('iteration_batched', entity_count, benchmark_iteration(entity_count, repeat, True))
+        # Entity by entity iteration gets slow for large scenes
+        if selected('iteration_per_entity') and entity_count <= per_entity_limit:
+            record('iteration_per_entity', entity_count, benchmark_iteration(entity_count, repeat, False))
+        if selected('transform_update_static'):
+            record('transform_update_static', entity_count, benchmark_transform_update(entity_count, repeat, False))
+        if selected('transform_update_moving'):
+            record('transform_update_moving', entity_count, benchmark_transform_update(entity_count, repeat, True))
+        if selected('link_update'):
+            for depth in depths:
+                record('link_update', entity_count, benchmark_link_update(entity_count, repeat, depth), depth=depth)
+        if selected('render'):
+            for material_count in material_counts:
+                for instanced in (False, True):
+                    durations, draw_calls = benchmark_render(entity_count, repeat, material_count, instanced)
+                    record('render', entity_count, durations, materials=material_count, instanced=instanced)
+                    results[-1]['draw_calls'] = draw_calls
+        if selected('memory'):
+            bytes_per_entity = benchmark_memory(entity_count)
+            results.append({'name': 'memory', 'entities': entity_count, 'parameters': {}, 'bytes_per_entity': bytes_per_entity})
+            print(f'{"memory":<28} {entity_count:>9} entities {bytes_per_entity:>10.1f} bytes/entity')
+
+    return results
+
+def compare(results: list, baseline: list):
+    """
+    Prints the ratio of every result to the matching one of a previous run, above 1 means slower.
+    """
+    def key(result):
+        return (result['name'], result['entities'], json.dumps(result['parameters'], sort_keys=True))
+
+    previous = {key(result): result for result in baseline}
+
+    for result in results:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+
+        metric = 'bytes_per_entity' if result['name'] == 'memory' else 'seconds'
+        ratio = result[metric] / old[metric] if old[metric] else float('inf')
+        print(f'{result["name"]:<28} {result["entities"]:>9} entities {ratio:>6.2f}x {result["parameters"] or ""}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks of the ECS core.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='entity counts of the synthetic scenes')
+    parser.add_argument('--depths', type=int, nargs='+', default=[1, 4, 16], help='hierarchy depths of the link benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark, the fastest one is reported')
+    parser.add_argument('--materials', type=int, nargs='+', default=[1, 16], help='material counts of the render benchmark')
+    parser.add_argument('--per-entity-limit', type=int, default=100000, help='largest scene for the entity by entity iteration')
+    parser.add_argument('--only', nargs='+', default=None, help='names of the benchmarks to run')
+    parser.add_argument('--output', default=None, help='JSON file to write the results to')
+    parser.add_argument('--compare', default=None, help='JSON results of a previous run to compare against')
+    arguments = parser.parse_args()
+
+    results = run_benchmarks(arguments.sizes, arguments.repeat, arguments.depths, arguments.per_entity_limit, arguments.only, arguments.materials)
+
+    report = {
+        'environment': {
+            'python': sys.version,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+        },
+        'results': results,
+    }
+
+    if arguments.output is not None:
+        with open(arguments.output, 'w') as file:
+            json.dump(report, file, indent=4)
+
+    if arguments.compare is not None:
+        with open(arguments.compare) as file:
+            compare(results, json.load(file)['results'])
+
+if __name__ == '__main__':
+    main()
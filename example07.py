@@ -87,12 +87,13 @@ def main():
     }
     """
 
+    # Declares the per instance a_Model, so entities sharing a mesh and material are drawn instanced
     textured_vertex_shader_code = """
     #version 330 core
     layout(location = 0) in vec3 a_Pos;
     layout(location = 1) in vec2 a_TexCoord;
+    layout(location = 2) in mat4 a_Model;
 
-    uniform mat4 model;
     uniform mat4 view;
     uniform mat4 projection;
 
@@ -101,7 +102,7 @@ def main():
     void main()
     {
         v_TexCoord = a_TexCoord;
-        gl_Position = vec4(a_Pos, 1.0) * model * view * projection;
+        gl_Position = vec4(a_Pos, 1.0) * a_Model * view * projection;
     }
     """
 